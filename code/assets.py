@@ -0,0 +1,357 @@
+import gc
+import os
+import types
+import threading
+import weakref
+import pygame
+from collections import OrderedDict
+from os import walk
+from settings import *
+import atlas
+from startup import startup
+
+ASSET_ROOT = os.path.normpath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def folder_files(path):
+    """文件夹里的图片文件，顺序和 support.import_folder 一样。"""
+    return [(image, path + '/' + image) for _, __, img_files in walk(path) for image in img_files]
+
+
+def asset_group(name):
+    """统计内存时的分组：'graphics/fruit/corn' -> 'graphics/fruit'，'audio/axe.mp3' -> 'audio'。"""
+    parts = name.split('/')
+    if len(parts) < 3 and '.' in parts[-1]:
+        return parts[0]
+    return '/'.join(parts[:2])
+
+
+def asset_bytes(asset):
+    """解码后占的内存（surface 按整块像素算，声音按 mixer 的格式算）。"""
+    if isinstance(asset, pygame.Surface):
+        return asset.get_pitch() * asset.get_height()
+    if isinstance(asset, list):
+        return sum(asset_bytes(part) for part in asset)
+    if isinstance(asset, dict):
+        return sum(asset_bytes(part) for part in asset.values())
+    if isinstance(asset, pygame.mixer.Sound):
+        frequency, size, channels = pygame.mixer.get_init()
+        return int(asset.get_length() * frequency * channels * abs(size) // 8)
+    return 0
+
+
+class Frames(list):
+    """缓存里的帧列表。普通的 list 不能弱引用，trim() 要靠弱引用判断还有没有人拿着。"""
+
+
+class FrameDict(dict):
+    """缓存里的帧字典，理由同 Frames。"""
+
+
+def rebind(old, new):
+    """把所有引用 old 的地方（字典、列表、对象属性、__slots__）都换成 new。很慢，只给热重载用。
+
+    元组、闭包之类改不了的引用还拿着 old，返回它们的类型名。
+    """
+    for referrer in gc.get_referrers(old):
+        if isinstance(referrer, dict):
+            for key, value in list(referrer.items()):
+                if value is old:
+                    referrer[key] = new
+        elif isinstance(referrer, list):
+            for index, value in enumerate(referrer):
+                if value is old:
+                    referrer[index] = new
+        else:
+            # 3.11 起属性没有单独建 __dict__ 时，引用者是对象本身而不是它的 __dict__
+            names = list(getattr(referrer, '__dict__', ()))
+            names += [name for cls in type(referrer).__mro__ for name in cls.__dict__.get('__slots__', ())]
+            for name in names:
+                if getattr(referrer, name, None) is old:
+                    setattr(referrer, name, new)
+    # 正在执行的函数（包括这里和调用者）的局部变量不算
+    return [type(referrer).__name__ for referrer in gc.get_referrers(old)
+            if not isinstance(referrer, types.FrameType)]
+
+
+def replace(old, new, stale):
+    """重新载入的资源 new 换掉 old，能原地改就原地改，返回以后该用的那个对象。
+
+    大小和格式都没变的表面直接把像素拷进旧表面，拿着它的精灵什么都不用做；
+    帧列表和字典原地更新；其他情况（大小变了、声音）换成新对象并 rebind，
+    rebind 改不了、还拿着旧对象的引用者类型记到 stale 里。
+    """
+    if isinstance(old, pygame.Surface) and isinstance(new, pygame.Surface):
+        if old.get_size() == new.get_size() and old.get_flags() & pygame.SRCALPHA and new.get_flags() & pygame.SRCALPHA:
+            # 先清空，MAX 混合就是原样拷贝
+            old.fill((0, 0, 0, 0))
+            old.blit(new, (0, 0), special_flags=pygame.BLEND_RGBA_MAX)
+            return old
+    elif isinstance(old, list) and isinstance(new, list):
+        if len(old) == len(new):
+            for index, part in enumerate(new):
+                old[index] = replace(old[index], part, stale)
+        else:
+            old[:] = new
+        return old
+    elif isinstance(old, dict) and isinstance(new, dict):
+        for name in list(old):
+            if name not in new:
+                del old[name]
+        for name, part in new.items():
+            old[name] = replace(old[name], part, stale) if name in old else part
+        return old
+    elif isinstance(old, pygame.mixer.Sound) and isinstance(new, pygame.mixer.Sound):
+        new.set_volume(old.get_volume())
+
+    stale.extend(rebind(old, new))
+    return new
+
+
+class AssetManager:
+    """图片、动画帧和声音的共享缓存。
+
+    资源按逻辑名取：相对项目根目录、用 '/' 分隔的路径，比如 'graphics/fruit/corn'、'audio/axe.mp3'。
+    第一次用到时才从磁盘读取并 convert，之后所有精灵拿到的都是同一份，
+    所以种地、砍树不会再碰磁盘。返回的表面和列表是共享的，不要在上面画东西或改动它们。
+
+    加载分两步：decode() 只读文件、解码，可以放在后台线程（见 preload.py）；
+    finish() 转换成显示格式，只能在主线程。
+
+    构建过图集（python code/atlas.py）时，打包过的图片和文件夹从图集里切出来，
+    整个游戏只需要打开几张大图；没有图集或不在图集里的照旧读文件。
+
+    每个资源解码后占多少内存都记着（usage() 按组汇总，缓存外的大表面用 track() 登记）。
+    超过 TEXTURE_BUDGET_MB 时 trim() 从最久没用过的开始释放没人拿着的资源，下次用到再重新载入。
+    正在被精灵或场景引用的资源释放了也省不下内存，所以不动它们。
+    """
+
+    def __init__(self, root=ASSET_ROOT):
+        self.root = root
+        # (kind, name) -> surface / [surfaces] / {name: surface} / Sound，最久没用过的排在前面
+        self.cache = OrderedDict()
+        # key -> bytes
+        self.sizes = {}
+        self.budget = TEXTURE_BUDGET_MB * 1024 * 1024 if TEXTURE_BUDGET_MB else None
+        self.over_budget = False
+        # 缓存之外、由各模块自己创建的大表面（烘焙的图块、标题背景……）-> group
+        self.tracked = weakref.WeakKeyDictionary()
+        # 图集索引和解码好的整张图，第一次用到时才读；decode 可能在多个线程里同时调用
+        self.atlas_index = None
+        self.atlas_sheets = {}
+        self.atlas_lock = threading.Lock()
+        # 热重载之后调用 listener(keys)：拿着资源的模块在这里重新取
+        self.listeners = []
+        # 这次运行里按原尺寸 load() 过的 (kind, name)，按第一次用到的顺序；preload 用它生成清单
+        self.requested = {}
+
+    def path(self, name):
+        return os.path.join(self.root, *name.split('/'))
+
+    def load_atlas(self):
+        with self.atlas_lock:
+            if self.atlas_index is None:
+                self.atlas_index = atlas.load_index() or {}
+            return self.atlas_index
+
+    def atlas_image(self, entry):
+        sheet, x, y, width, height = entry
+        with self.atlas_lock:
+            surf = self.atlas_sheets.get(sheet)
+            if surf is None:
+                file = os.path.join(atlas.ATLAS_DIR, self.atlas_index['sheets'][sheet])
+                surf = self.atlas_sheets[sheet] = pygame.image.load(file)
+        return surf.subsurface((x, y, width, height))
+
+    def atlas_fresh(self, names):
+        """这些原图打包之后都没改过。"""
+        sources = self.atlas_index.get('sources', {})
+        return all(atlas.source_stamp(self.path(name)) == sources.get(name) for name in names)
+
+    def decode_atlas(self, kind, name):
+        """从图集里切；图集里没有或者原图改过（图集过期）时返回 None。"""
+        index = self.load_atlas()
+        if kind == 'image':
+            entry = index.get('images', {}).get(name)
+            return self.atlas_image(entry) if entry and self.atlas_fresh([name]) else None
+        entries = index.get('folders', {}).get(name)
+        if entries is None:
+            return None
+        # 文件夹里加了、删了图也算过期
+        try:
+            files = os.listdir(self.path(name))
+        except OSError:
+            return None
+        if sorted(files) != sorted(image for image, *_ in entries):
+            return None
+        if not self.atlas_fresh([f'{name}/{image}' for image, *_ in entries]):
+            return None
+        if kind == 'frames':
+            return [self.atlas_image(entry) for _, *entry in entries]
+        return {image.split('.')[0]: self.atlas_image(entry) for image, *entry in entries}
+
+    def decode(self, kind, name, use_atlas=True):
+        if use_atlas and kind in ('image', 'frames', 'frames_dict'):
+            decoded = self.decode_atlas(kind, name)
+            if decoded is not None:
+                return decoded
+
+        path = self.path(name)
+        if kind == 'image':
+            return pygame.image.load(path)
+        if kind == 'frames':
+            return [pygame.image.load(file) for _, file in folder_files(path)]
+        if kind == 'frames_dict':
+            return {image.split('.')[0]: pygame.image.load(file) for image, file in folder_files(path)}
+        if kind == 'sound':
+            return pygame.mixer.Sound(path)
+        raise ValueError(f'Unknown asset kind: {kind}')
+
+    def finish(self, kind, decoded, size=None):
+        if kind == 'image':
+            surf = decoded.convert_alpha()
+            return pygame.transform.scale(surf, size) if size else surf
+        if kind == 'frames':
+            return Frames(surf.convert_alpha() for surf in decoded)
+        if kind == 'frames_dict':
+            return FrameDict((name, surf.convert_alpha()) for name, surf in decoded.items())
+        return decoded
+
+    def store(self, kind, name, asset):
+        key = (kind, name)
+        if key not in self.cache:
+            self.cache[key] = asset
+            self.sizes[key] = asset_bytes(asset)
+            self.trim(keep=key)
+
+    def load(self, kind, name, size=None):
+        key = (kind, name) if size is None else (kind, name, size)
+        if size is None:
+            self.requested[key] = None
+        asset = self.cache.get(key)
+        if asset is None:
+            with startup.measure('assets'):
+                asset = self.cache[key] = self.finish(kind, self.decode(kind, name), size)
+            self.sizes[key] = asset_bytes(asset)
+            self.trim(keep=key)
+        else:
+            self.cache.move_to_end(key)
+        return asset
+
+    def image(self, name, size=None):
+        """size 不为空时返回缩放到 size 的版本（单独缓存）。"""
+        return self.load('image', name, size)
+
+    def frames(self, name):
+        """一个文件夹里的所有图片（动画帧），顺序和 import_folder 一样。"""
+        return self.load('frames', name)
+
+    def frames_dict(self, name):
+        return self.load('frames_dict', name)
+
+    def sound(self, name, volume=None):
+        sound = self.load('sound', name)
+        if volume is not None:
+            sound.set_volume(volume)
+        return sound
+
+    # ---------- hot reload ----------
+    def affected(self, name):
+        """文件 name 改了之后要重新载入的缓存键：这张图本身，或者它所在文件夹的帧。"""
+        folder = name.rsplit('/', 1)[0]
+        return [key for key in self.cache
+                if key[1] == name or (key[0] in ('frames', 'frames_dict') and key[1] == folder)]
+
+    def reload(self, names):
+        """开发模式热重载：这些文件影响到的资源直接从文件重新解码（图集可能已经过期），
+        用 replace() 尽量原地换掉，然后通知 listeners。返回重新载入了的缓存键。"""
+        keys = {key for name in names for key in self.affected(name)}
+        for key in keys:
+            kind, name = key[:2]
+            size = key[2] if len(key) > 2 else None
+            try:
+                new = self.finish(kind, self.decode(kind, name, use_atlas=False), size)
+            except (pygame.error, OSError) as e:
+                print(f'Reload failed for {name}: {e}')
+                continue
+            stale = []
+            self.cache[key] = replace(self.cache[key], new, stale)
+            self.sizes[key] = asset_bytes(self.cache[key])
+            if stale:
+                print(f"Reload: {name} is still held by {', '.join(sorted(set(stale)))}, "
+                      f"those keep the old version until restart")
+        if keys:
+            for listener in self.listeners:
+                listener(keys)
+        return keys
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    # ---------- memory ----------
+    def track(self, surf, group):
+        """把缓存之外的大表面记到 group 上，只用来统计，表面被回收后自动去掉。"""
+        self.tracked[surf] = group
+
+    def usage(self):
+        """group -> bytes：缓存里的资源、解码好的图集，加上 track() 登记的表面。"""
+        groups = {}
+        for key, size in self.sizes.items():
+            group = asset_group(key[1])
+            groups[group] = groups.get(group, 0) + size
+        for sheet in self.atlas_sheets.values():
+            groups['atlas'] = groups.get('atlas', 0) + asset_bytes(sheet)
+        for surf, group in list(self.tracked.items()):
+            groups[group] = groups.get(group, 0) + asset_bytes(surf)
+        return groups
+
+    def report(self):
+        groups = self.usage()
+        lines = [f'Surface memory: {sum(groups.values()) / 1048576:.1f} MB'
+                 + (f' (budget {self.budget / 1048576:.0f} MB)' if self.budget else '')]
+        for group, size in sorted(groups.items(), key=lambda item: -item[1]):
+            lines.append(f'  {group:<24}{size / 1048576:8.2f} MB')
+        return '\n'.join(lines)
+
+    def release(self, key):
+        """把 key 从缓存里拿掉。没有别人拿着（精灵、场景）时资源就此释放，返回 True；
+        拿掉之后弱引用还活着说明有人在用，放回缓存（算作刚用过），返回 False。
+        帧列表和字典按整体算：用的人拿的都是整个列表或字典。"""
+        asset = self.cache[key]
+        # 正在播放的声音只有 mixer 拿着，不能放
+        if isinstance(asset, pygame.mixer.Sound) and asset.get_num_channels() > 0:
+            return False
+        ref = weakref.ref(asset)
+        del asset
+        del self.cache[key]
+        asset = ref()
+        if asset is None:
+            return True
+        self.cache[key] = asset
+        return False
+
+    def trim(self, keep=None):
+        """超出预算时释放：先是图集的整张图（只在解码时用），再按最久没用的顺序释放没人拿着的资源。"""
+        if self.budget is None:
+            return
+        total = sum(self.usage().values())
+        if total <= self.budget:
+            self.over_budget = False
+            return
+
+        with self.atlas_lock:
+            for sheet in list(self.atlas_sheets):
+                total -= asset_bytes(self.atlas_sheets.pop(sheet))
+        for key in list(self.cache):
+            if total <= self.budget:
+                break
+            if key != keep and self.release(key):
+                total -= self.sizes.pop(key)
+
+        # 剩下的都在用，释放不了；每次超出只提醒一次
+        if total > self.budget and not self.over_budget:
+            print(f'Surface memory over budget, everything left is in use\n{self.report()}')
+        self.over_budget = total > self.budget
+
+
+assets = AssetManager()
@@ -0,0 +1,136 @@
+"""把小图打包成几张图集，减少启动时打开文件的次数。
+
+构建（改了图片之后重新跑一次）：
+
+    python code/atlas.py
+
+输出在 graphics/atlas/：sheet_N.png 加上 index.json。AssetManager 发现索引时，
+打包过的文件夹和图片直接从图集里切子表面；没有图集时照旧一个个读文件。
+索引记着每张原图的修改时间和大小，原图改过（图集过期）的那些也照旧读文件。
+"""
+import os
+import json
+import pygame
+
+ATLAS_ROOT = os.path.normpath(os.path.join(os.path.dirname(__file__), '..'))
+ATLAS_DIR = os.path.join(ATLAS_ROOT, 'graphics', 'atlas')
+ATLAS_INDEX = os.path.join(ATLAS_DIR, 'index.json')
+ATLAS_VERSION = 2
+ATLAS_SHEET_SIZE = 2048
+# 比这大的图（地面、标题背景、对话气泡）单独读更划算
+ATLAS_MAX_IMAGE = 256
+# 通过 assets 加载的文件夹（含子文件夹）；地图图块集由 tilemap 自己加载，不在这里
+ATLAS_FOLDERS = [
+    'graphics/character',
+    'graphics/soil',
+    'graphics/soil_water',
+    'graphics/water',
+    'graphics/rain',
+    'graphics/fruit',
+    'graphics/pet/idle',
+    'graphics/pet/walk',
+    'graphics/overlay',
+    'graphics/stumps',
+]
+
+
+def collect_images(root=ATLAS_ROOT):
+    """要打包的小图：逻辑名 -> surface。"""
+    images = {}
+    for folder in ATLAS_FOLDERS:
+        for path, _, files in os.walk(os.path.join(root, *folder.split('/'))):
+            for file in files:
+                if not file.lower().endswith('.png'):
+                    continue
+                surf = pygame.image.load(os.path.join(path, file)).convert_alpha()
+                if max(surf.get_size()) <= ATLAS_MAX_IMAGE:
+                    name = os.path.relpath(os.path.join(path, file), root).replace(os.sep, '/')
+                    images[name] = surf
+    return images
+
+
+def folder_entries(root=ATLAS_ROOT):
+    """每个最底层文件夹的 (文件名, 逻辑名) 列表，顺序和 assets.folder_files 一样。"""
+    folders = {}
+    for folder in ATLAS_FOLDERS:
+        for path, dirs, files in os.walk(os.path.join(root, *folder.split('/'))):
+            if not dirs:
+                name = os.path.relpath(path, root).replace(os.sep, '/')
+                folders[name] = [(file, f'{name}/{file}') for file in files]
+    return folders
+
+
+def source_stamp(path):
+    """原图的 [修改时间, 大小]，和索引里记的不一样说明图集里那份过期了。"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime, stat.st_size]
+
+
+def pack(sizes, size=ATLAS_SHEET_SIZE):
+    """简单的按行装箱：高的先放。sizes 是 name -> (w, h)，返回 name -> (sheet, x, y, w, h)。"""
+    placements = {}
+    sheet, x, y, row_height = 0, 0, 0, 0
+    for name in sorted(sizes, key=lambda name: -sizes[name][1]):
+        width, height = sizes[name]
+        if x + width > size:
+            x, y, row_height = 0, y + row_height, 0
+        if y + height > size:
+            sheet, x, y, row_height = sheet + 1, 0, 0, 0
+        placements[name] = (sheet, x, y, width, height)
+        x += width
+        row_height = max(row_height, height)
+    return placements
+
+
+def build(root=ATLAS_ROOT):
+    images = collect_images(root)
+    placements = pack({name: surf.get_size() for name, surf in images.items()})
+
+    sheet_count = max(entry[0] for entry in placements.values()) + 1 if placements else 0
+    sheets = [pygame.Surface((ATLAS_SHEET_SIZE, ATLAS_SHEET_SIZE), pygame.SRCALPHA) for _ in range(sheet_count)]
+    for name, (sheet, x, y, _, __) in placements.items():
+        # 目标是全透明的，MAX 混合就是原样拷贝像素
+        sheets[sheet].blit(images[name], (x, y), special_flags=pygame.BLEND_RGBA_MAX)
+
+    index = {'version': ATLAS_VERSION, 'sheets': [], 'images': {}, 'folders': {}, 'sources': {}}
+    for name, entry in placements.items():
+        index['images'][name] = list(entry)
+        index['sources'][name] = source_stamp(os.path.join(root, *name.split('/')))
+    # 文件夹里只要有一个文件没打包（太大、不是 png），整个文件夹还是从磁盘读，保证帧的顺序不变
+    for folder, files in folder_entries(root).items():
+        if files and all(name in placements for _, name in files):
+            index['folders'][folder] = [[file, *placements[name]] for file, name in files]
+
+    os.makedirs(ATLAS_DIR, exist_ok=True)
+    for number, surf in enumerate(sheets):
+        # 只存用到的部分，空白也要解码
+        used = [pygame.Rect(entry[1:]) for entry in placements.values() if entry[0] == number]
+        file = f'sheet_{number}.png'
+        pygame.image.save(surf.subsurface((0, 0, *used[0].unionall(used).bottomright)), os.path.join(ATLAS_DIR, file))
+        index['sheets'].append(file)
+    with open(ATLAS_INDEX, 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+
+    print(f"Packed {len(images)} images ({len(index['folders'])} folders) into {sheet_count} sheet(s)")
+
+
+def load_index():
+    """图集索引；没有构建过或版本不对时返回 None。"""
+    try:
+        with open(ATLAS_INDEX, encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if index.get('version') != ATLAS_VERSION:
+        return None
+    return index
+
+
+if __name__ == '__main__':
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    build()
@@ -0,0 +1,77 @@
+import pygame
+from settings import *
+from sprites import Generic, Water
+from assets import assets
+
+
+class ChunkBaker:
+    """把不会变化的地块预先合成到几张大表面上。
+
+    平铺的层（比如房子地板）按 BAKE_CHUNK_TILES x BAKE_CHUNK_TILES 的块合成；
+    需要和玩家做前后遮挡的层（墙、栅栏）按行合成成横条，
+    每条的 centery 和原来单个瓦片一样，所以 Y 轴排序的结果不变。
+    """
+
+    def __init__(self, chunk_tiles=BAKE_CHUNK_TILES):
+        self.chunk_size = chunk_tiles * TILE_SIZE
+        # (z, chunk_x, chunk_y or row centery) -> [(rect, surf), ...]
+        self.chunks = {}
+
+    def add(self, pos, surf, z, y_sort=False):
+        rect = surf.get_rect(topleft=pos)
+        if y_sort:
+            key = (z, rect.x // self.chunk_size, rect.centery)
+        else:
+            key = (z, rect.x // self.chunk_size, rect.y // self.chunk_size)
+        self.chunks.setdefault(key, []).append((rect, surf))
+
+    def bake_surface(self, tiles):
+        bounds = tiles[0][0].unionall([rect for rect, _ in tiles[1:]])
+        surf = pygame.Surface(bounds.size, pygame.SRCALPHA)
+        # same order the y-sorted draw used to blit them in
+        for rect, tile in sorted(tiles, key=lambda item: item[0].centery):
+            surf.blit(tile, (rect.x - bounds.x, rect.y - bounds.y))
+        assets.track(surf, 'baked')
+        return bounds, surf
+
+    def bake(self, groups):
+        sprites = []
+        for (z, _, _), tiles in self.chunks.items():
+            bounds, surf = self.bake_surface(tiles)
+            sprites.append(Generic(bounds.topleft, surf, groups, z))
+        self.chunks = {}
+        return sprites
+
+
+class WaterLayer:
+    """整张地图的水面。
+
+    每个块把水的所有动画帧都预先合成好，由这一个时钟统一切换，
+    不再是每个水瓦片一个精灵、各自 update。
+    """
+
+    def __init__(self, positions, frames, groups):
+        bakers = [ChunkBaker() for _ in frames]
+        for pos in positions:
+            for baker, frame in zip(bakers, frames):
+                baker.add(pos, frame, LAYERS['water'])
+
+        self.chunks = []
+        for key in bakers[0].chunks:
+            baked = [baker.bake_surface(baker.chunks[key]) for baker in bakers]
+            bounds = baked[0][0]
+            self.chunks.append(Water(bounds.topleft, [surf for _, surf in baked], groups))
+
+        self.frames_count = len(frames)
+        self.frame_index = 0
+
+    def update(self, dt):
+        previous = int(self.frame_index)
+        self.frame_index += 5 * dt
+        if self.frame_index >= self.frames_count:
+            self.frame_index = 0
+
+        current = int(self.frame_index)
+        if current != previous:
+            for chunk in self.chunks:
+                chunk.image = chunk.frames[current]
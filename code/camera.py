@@ -0,0 +1,290 @@
+import pygame
+import weakref
+from bisect import bisect_left, bisect_right
+from settings import *
+
+
+class DepthLayer:
+    """同一个 z 层里的精灵，一直按 (centery, 加入顺序) 排好序。"""
+
+    def __init__(self):
+        self.keys = []
+        self.sprites = []
+        # 用来把 Y 轴窗口放宽，保证高个子精灵（树、地面）不会被漏掉
+        self.max_half_height = 0
+
+    def insert(self, key, sprite):
+        index = bisect_left(self.keys, key)
+        self.keys.insert(index, key)
+        self.sprites.insert(index, sprite)
+        half_height = (sprite.rect.height + 1) // 2
+        if half_height > self.max_half_height:
+            self.max_half_height = half_height
+
+    def remove(self, key):
+        index = bisect_left(self.keys, key)
+        del self.keys[index]
+        del self.sprites[index]
+
+    def window(self, top, bottom):
+        lo = bisect_left(self.keys, (top - self.max_half_height,))
+        hi = bisect_right(self.keys, (bottom + self.max_half_height, float('inf')))
+        return self.sprites[lo:hi]
+
+
+class CameraGroup(pygame.sprite.Group):
+    """以玩家为中心的绘制组。
+
+    精灵按 rect 登记到一个空间哈希（CAMERA_CELL_SIZE 大小的格子）里，
+    custom_draw 只取出与镜头（加上 CAMERA_MARGIN 边距）相交的格子里的精灵，
+    所以每帧的绘制开销只跟屏幕上的东西有关，跟地图大小无关。
+
+    绘制顺序保存在每个 z 层各自的 DepthLayer 里，跨帧保持有序，
+    只有动过的精灵才会重新插入，不再每帧把整个组 sorted() 一遍。
+
+    世界画在 surface 上（默认就是窗口）。RENDER_SCALE > 1 时 surface 是缩小的内部画布，
+    图片按比例缩小后缓存起来，由 Level 每帧整数倍放大到窗口一次。
+    这时镜头只按 RENDER_SCALE 的整数倍移动，每个精灵缩放成 floor(left/scale)..floor(right/scale)
+    那么大，相邻的地块不管 scale 能不能整除它们的大小都严丝合缝。
+
+    分屏时每个视口各调用一次 custom_draw：空间哈希、排好序的各层和缩放过的图片都共用，
+    每个视口只做自己的裁剪和 blit。
+    """
+
+    def __init__(self, surface=None):
+        super().__init__()
+        self.display_surface = surface or pygame.display.get_surface()
+        self.offset = pygame.math.Vector2()
+        self.offset_x = 0
+        self.offset_y = 0
+        # 正在画的视口：画布上的子表面和它在画布上的左上角
+        self.target = self.display_surface
+        self.origin = (0, 0)
+        self.targets = {}
+
+        # internal resolution: world pixels per render-target pixel
+        self.scale = RENDER_SCALE
+        self.scaled_images = weakref.WeakKeyDictionary()
+
+        # spatial hash: (cell_x, cell_y) -> set of sprites
+        self.cell_size = CAMERA_CELL_SIZE
+        self.cells = {}
+        # sprite -> (indexed rect, z, cells it was put in)
+        self.sprite_cells = {}
+
+        # draw order: z -> DepthLayer, plus the z values in drawing order
+        self.depth_layers = {}
+        self.z_order = []
+
+        # 不是精灵、但要按层级插进来画的东西（雨）：z -> [painter(camera)]
+        self.painters = {}
+        # 正在画（或最后画）的视口的镜头范围（世界坐标，含边距）和里面的精灵
+        self.view = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.visible = set()
+        # 每个视口最近一次的镜头范围，和要画的对话气泡
+        self.views = {}
+        self.bubble_views = {}
+        # insertion order, used as a stable tie-breaker when sorting
+        self.order = {}
+        self.next_order = 0
+
+        # 有自己 update() 的精灵才会动（玩家、宠物、雨滴、粒子……）
+        # dict 保持插入顺序，update 的先后和原来一致
+        self.moving_sprites = {}
+        # 很多精灵在 super().__init__(groups) 之后才设置 rect，所以延后到绘制前再登记
+        self.pending_sprites = {}
+        # 会画对话气泡的精灵（宠物），加入时登记一次，绘制时不用再逐个 hasattr
+        self.bubble_sprites = {}
+
+    # ---------- group bookkeeping ----------
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self.order[sprite] = self.next_order
+        self.next_order += 1
+        if type(sprite).update is not pygame.sprite.Sprite.update:
+            self.moving_sprites[sprite] = None
+        if hasattr(sprite, 'get_dialogue_surf'):
+            self.bubble_sprites[sprite] = None
+        self.pending_sprites[sprite] = None
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.unindex(sprite)
+        self.pending_sprites.pop(sprite, None)
+        self.order.pop(sprite, None)
+        self.moving_sprites.pop(sprite, None)
+        self.bubble_sprites.pop(sprite, None)
+
+    # ---------- spatial hash ----------
+    def cell_range(self, rect):
+        size = self.cell_size
+        return (range(rect.left // size, (rect.right - 1) // size + 1),
+                range(rect.top // size, (rect.bottom - 1) // size + 1))
+
+    def index(self, sprite):
+        rect = sprite.rect.copy()
+        xs, ys = self.cell_range(rect)
+        keys = [(x, y) for x in xs for y in ys]
+        for key in keys:
+            cell = self.cells.get(key)
+            if cell is None:
+                cell = self.cells[key] = set()
+            cell.add(sprite)
+        self.sprite_cells[sprite] = (rect, sprite.z, keys)
+
+        self.depth_layer(sprite.z).insert((rect.centery, self.order[sprite]), sprite)
+
+    def unindex(self, sprite):
+        entry = self.sprite_cells.pop(sprite, None)
+        if entry is None:
+            return
+        rect, z, keys = entry
+        for key in keys:
+            cell = self.cells.get(key)
+            if cell is not None:
+                cell.discard(sprite)
+                if not cell:
+                    del self.cells[key]
+        self.depth_layers[z].remove((rect.centery, self.order[sprite]))
+
+    def depth_layer(self, z):
+        layer = self.depth_layers.get(z)
+        if layer is None:
+            layer = self.depth_layers[z] = DepthLayer()
+            self.z_order = sorted(self.depth_layers)
+        return layer
+
+    def add_painter(self, z, painter):
+        """painter(camera) 会在 z 层的精灵画完之后调用，用 camera.image() 和 camera.scale 换算到画布。"""
+        self.depth_layer(z)
+        self.painters.setdefault(z, []).append(painter)
+
+    def refresh(self, sprite):
+        """精灵在 update() 之外改了 rect、z 或图片内容（长大的植物、变树桩的树、耕地）时调用。"""
+        self.scaled_images.pop(sprite.image, None)
+        if sprite in self.sprite_cells:
+            self.unindex(sprite)
+            self.index(sprite)
+
+    def reindex_moving(self):
+        if self.pending_sprites:
+            for sprite in self.pending_sprites:
+                self.index(sprite)
+            self.pending_sprites.clear()
+
+        cells = self.sprite_cells
+        for sprite in self.moving_sprites:
+            entry = cells[sprite]
+            if sprite.rect != entry[0] or sprite.z != entry[1]:
+                self.unindex(sprite)
+                self.index(sprite)
+
+    def visible_sprites(self, view):
+        found = set()
+        xs, ys = self.cell_range(view)
+        cells = self.cells
+        for x in xs:
+            for y in ys:
+                cell = cells.get((x, y))
+                if cell:
+                    found.update(cell)
+        return {sprite for sprite in found if sprite.rect.colliderect(view)}
+
+    def image(self, surf, size=None):
+        """surf 缩放到渲染画布的分辨率（RENDER_SCALE 为 1 时原样返回）。
+
+        size 是画布上的大小，默认 floor(宽高 / scale)；同一张图缩放成的每种大小都缓存。
+        """
+        if self.scale == 1:
+            return surf
+        if size is None:
+            width, height = surf.get_size()
+            size = (max(1, width // self.scale), max(1, height // self.scale))
+        sizes = self.scaled_images.get(surf)
+        if sizes is None:
+            sizes = self.scaled_images[surf] = {}
+        scaled = sizes.get(size)
+        if scaled is None:
+            scaled = sizes[size] = pygame.transform.scale(surf, size)
+        return scaled
+
+    # ---------- update & draw ----------
+    def update(self, dt):
+        # 静止的地块、栅栏、苹果没有 update，不必每帧都调用
+        for sprite in tuple(self.moving_sprites):
+            sprite.update(dt)
+
+    def viewport(self, rect):
+        key = tuple(rect)
+        target = self.targets.get(key)
+        if target is None:
+            if rect == self.display_surface.get_rect():
+                target = self.display_surface
+            else:
+                target = self.display_surface.subsurface(rect)
+            self.targets[key] = target
+        return key, target
+
+    def custom_draw(self, player, rect=None):
+        """以 player 为中心画一个视口；rect 是它在画布上的区域，默认整块画布。"""
+        if rect is None:
+            rect = self.display_surface.get_rect()
+        key, self.target = self.viewport(rect)
+        self.origin = rect.topleft
+        width = rect.width * self.scale
+        height = rect.height * self.scale
+
+        # 相机以玩家为中心
+        self.offset.x = player.rect.centerx - width / 2
+        self.offset.y = player.rect.centery - height / 2
+        offset_x = int(self.offset.x)
+        offset_y = int(self.offset.y)
+        # 缩小画的时候镜头对齐到 scale 的整数倍，精灵在画布上的边界就只跟它自己的位置有关
+        offset_x = self.offset_x = offset_x - offset_x % self.scale
+        offset_y = self.offset_y = offset_y - offset_y % self.scale
+
+        # 第二个视口时已经没有要重新登记的了
+        self.reindex_moving()
+        view = pygame.Rect(offset_x, offset_y, width, height).inflate(CAMERA_MARGIN * 2, CAMERA_MARGIN * 2)
+        visible = self.visible = self.visible_sprites(view)
+        self.view = self.views[key] = view
+        painters = self.painters
+
+        # 核心：按层级 + Y轴顺序绘制（Y轴越小越在后面，完美实现前后遮挡）
+        blit = self.target.blit
+        image = self.image
+        scale = self.scale
+        origin_x, origin_y = offset_x // scale, offset_y // scale
+        for z in self.z_order:
+            for sprite in self.depth_layers[z].window(view.top, view.bottom):
+                if sprite not in visible:
+                    continue
+                rect = sprite.rect
+                if scale == 1:
+                    blit(sprite.image, (rect.x - offset_x, rect.y - offset_y))
+                    continue
+                surf = sprite.image
+                width, height = surf.get_size()
+                left, top = rect.x // scale, rect.y // scale
+                size = ((rect.x + width) // scale - left, (rect.y + height) // scale - top)
+                blit(image(surf, size), (left - origin_x, top - origin_y))
+
+            if z in painters:
+                for painter in painters[z]:
+                    painter(self)
+
+        area = pygame.Rect(rect.x * self.scale, rect.y * self.scale, width, height)
+        bubbles = [sprite for sprite in self.bubble_sprites if sprite in visible]
+        self.bubble_views[key] = (area, offset_x - area.x, offset_y - area.y, bubbles)
+
+    def draw_bubbles(self, surface):
+        """对话气泡当作 UI，在世界合成（色调、放大）之后按窗口分辨率画，每个视口只画在自己的区域里。"""
+        for area, offset_x, offset_y, bubbles in self.bubble_views.values():
+            surface.set_clip(area)
+            for sprite in bubbles:
+                bubble_surf = sprite.get_dialogue_surf()
+                if bubble_surf:
+                    bubble_rect = bubble_surf.get_rect()
+                    bubble_rect.midbottom = (sprite.rect.centerx - offset_x, sprite.rect.top - offset_y - 10)
+                    surface.blit(bubble_surf, bubble_rect)
+        surface.set_clip(None)
@@ -47,11 +47,12 @@ You are a helpful assistant for this farming game. You know everything about the
 Answer in one sentence as much as possible,Fewer than 25 English words, be direct like a game NPC!
 """
 import pygame
-import requests
 import threading
-import os
 from settings import *
 import queue
+from bisect import bisect_left, bisect_right
+from support import get_font
+from assets import assets
 from player import Player
 
 class ChatBox:
@@ -63,14 +64,13 @@ class ChatBox:
         self.height = 400
         self.rect = pygame.Rect((self.screen_width - self.width) // 2, 200, self.width, self.height)
         
-        bg_path = os.path.join(os.path.dirname(__file__), '..', 'graphics', 'chat_bg.png')
-        self.bg_img = pygame.image.load(bg_path).convert_alpha()
+        self.bg_img = assets.image('graphics/chat_bg.png')
         self.border_color = (133, 79, 34)
         self.text_color = (220, 220, 220)
         self.input_bg = (50, 50, 60)
         
         self.font_size = 24
-        self.font = pygame.font.Font(font_path or pygame.font.get_default_font(), self.font_size)
+        self.font = get_font(font_path, self.font_size)
         
         self.active = False
         self.input_text = ""
@@ -90,6 +90,24 @@ class ChatBox:
         self.api_url = "http://localhost:1234/v1/chat/completions"
         self.model = "openai/gpt-oss-20b"     
 
+        # ---------- 绘制用的缓存：不变的东西只做一次 ----------
+        self.draw_font = get_font(FONT_PATH, FONT_SIZE)
+        self.line_height = FONT_SIZE + 8
+        self.chat_rect = pygame.Rect(self.rect.x + 15, self.rect.y + 55, self.rect.width - 30, self.rect.height - 110)
+        self.input_rect = pygame.Rect(self.rect.x + 15, self.rect.y + self.rect.height - 50, self.rect.width - 30, 35)
+        self.static_surfs = None
+
+        # (role, content, width) -> 渲染好的行；消息到达时排版一次
+        self.layout_cache = {}
+        # 整个历史排好版后每一行相对内容顶部的 y，以及对应的 surface
+        self.line_tops = []
+        self.line_surfs = []
+        self.content_height = 0
+        self.layout_dirty = True
+
+        self.input_surf = None
+        self.input_surf_text = None
+
     def toggle(self):
         self.active = not self.active
 
@@ -144,6 +162,7 @@ class ChatBox:
         # 1. 把玩家输入加进历史
         self.history.append({"role": "user", "content": text})
         self.history = self.history[-20:]          # 最多保留20条对话
+        self.layout_dirty = True
         self.thinking = True
 
         # 2. 获取当前游戏状态（你只需要把 level 传进来一次就行，后面会补）
@@ -175,6 +194,8 @@ Current status:
 
         def thread_func():
             try:
+                # requests 导入要几十毫秒，第一次发消息时才在这个后台线程里导入
+                import requests
                 payload = {
                     "model": self.model,
                     "messages": messages_for_llm,
@@ -203,77 +224,113 @@ Current status:
             reply = self.pending_reply
             print(f"[LLM] Reply displayed: {reply}")
             self.history.append({"role": "assistant", "content": reply})
+            self.layout_dirty = True
             self.thinking = False
             self.reply_ready = False      # 重置
             self.pending_reply = None
 
-# chat.py → draw() 方法（替换原函数）
-    def draw(self):
-        if not self.active:
-            return
+    def build_static_surfs(self):
+        text_color = UI_COLORS['text']
 
         # 聊天框背景图片
         bg_surf = pygame.transform.smoothscale(self.bg_img, (self.width, self.height))
-        self.screen.blit(bg_surf, (self.rect.x, self.rect.y))
-
-        font = pygame.font.Font(FONT_PATH, FONT_SIZE)
-        text_color = UI_COLORS['text']
-        border_color = UI_COLORS['border']
 
         # 半透明历史消息区
-        chat_rect = pygame.Rect(self.rect.x + 15, self.rect.y + 55, self.rect.width - 30, self.rect.height - 110)
-        chat_bg = pygame.Surface((chat_rect.width, chat_rect.height), pygame.SRCALPHA)
+        chat_bg = pygame.Surface(self.chat_rect.size, pygame.SRCALPHA)
         chat_bg.fill((40, 40, 50, 140))  # 深色半透明
-        self.screen.blit(chat_bg, chat_rect.topleft)
 
         # 半透明输入框
-        input_rect = pygame.Rect(self.rect.x + 15, self.rect.y + self.rect.height - 50, self.rect.width - 30, 35)
-        input_bg = pygame.Surface((input_rect.width, input_rect.height), pygame.SRCALPHA)
+        input_bg = pygame.Surface(self.input_rect.size, pygame.SRCALPHA)
         input_bg.fill((255, 255, 255, 180))  # 白色半透明
-        self.screen.blit(input_bg, input_rect.topleft)
-        pygame.draw.rect(self.screen, border_color, input_rect, 2, border_radius=8)
-
-        # 聊天框边框
-        pygame.draw.rect(self.screen, border_color, self.rect, 3, border_radius=12)
-
-        # 标题
-        title = font.render("AI Chat (English)", True, text_color)
-        self.screen.blit(title, (self.rect.x + 20, self.rect.y + 15))
 
-        # 聊天历史
-        y = chat_rect.y + 10 - self.scroll_offset
-        line_height = FONT_SIZE + 8
-        total_height = 0
+        self.static_surfs = {
+            'bg': bg_surf,
+            'chat_bg': chat_bg,
+            'input_bg': input_bg,
+            'title': self.draw_font.render("AI Chat (English)", True, text_color),
+            'think': self.draw_font.render("Thinking...", True, (150, 150, 255)),
+            'hint': self.draw_font.render("TAB to open | TAB to close | Enter to send", True, (150, 150, 150)),
+        }
+
+    def layout_message(self, msg, width):
+        key = (msg["role"], msg["content"], width)
+        lines = self.layout_cache.get(key)
+        if lines is None:
+            color = (0, 0, 0) if msg["role"] == "assistant" else (220, 220, 100)
+            lines = [self.draw_font.render(line, True, color) for line in self.wrap_text(msg["content"], width)]
+            self.layout_cache[key] = lines
+        return lines
 
+    def update_layout(self):
+        width = self.chat_rect.width - 20
+        self.line_tops = []
+        self.line_surfs = []
+        y = 0
+        used = {}
         for msg in self.history:
-            lines = self.wrap_text(msg["content"], chat_rect.width - 20)
-            for line in lines:
-                color = (0, 0, 0) if msg["role"] == "assistant" else (220, 220, 100)
-                text_surf = font.render(line, True, color)
-                text_surf.set_alpha(255)
-                if y + line_height > chat_rect.y and y < chat_rect.bottom:
-                    self.screen.blit(text_surf, (chat_rect.x + 10, y))
-                y += line_height
-                total_height += line_height
+            lines = self.layout_message(msg, width)
+            used[(msg["role"], msg["content"], width)] = lines
+            for surf in lines:
+                self.line_tops.append(y)
+                self.line_surfs.append(surf)
+                y += self.line_height
             y += 8
-            total_height += 8
+        self.content_height = y
+
+        # 已经滚出历史记录的消息不再占着缓存
+        self.layout_cache = used
+        self.layout_dirty = False
 
         # 计算最大可滚动距离
-        self.max_scroll = max(0, total_height - chat_rect.height + 50)
+        self.max_scroll = max(0, self.content_height - self.chat_rect.height + 50)
         self.scroll_offset = min(self.scroll_offset, self.max_scroll)
 
+    def draw(self):
+        if not self.active:
+            return
+
+        if self.static_surfs is None:
+            self.build_static_surfs()
+        if self.layout_dirty:
+            self.update_layout()
+
+        surfs = self.static_surfs
+        border_color = UI_COLORS['border']
+        chat_rect = self.chat_rect
+        input_rect = self.input_rect
+
+        self.screen.blit(surfs['bg'], (self.rect.x, self.rect.y))
+        self.screen.blit(surfs['chat_bg'], chat_rect.topleft)
+        self.screen.blit(surfs['input_bg'], input_rect.topleft)
+        pygame.draw.rect(self.screen, border_color, input_rect, 2, border_radius=8)
+
+        # 聊天框边框
+        pygame.draw.rect(self.screen, border_color, self.rect, 3, border_radius=12)
+
+        # 标题
+        self.screen.blit(surfs['title'], (self.rect.x + 20, self.rect.y + 15))
+
+        # 聊天历史：只画和可见窗口相交的那几行
+        top = chat_rect.y + 10 - self.scroll_offset
+        first = bisect_right(self.line_tops, chat_rect.y - top - self.line_height)
+        last = bisect_left(self.line_tops, chat_rect.bottom - top)
+        x = chat_rect.x + 10
+        for i in range(first, last):
+            self.screen.blit(self.line_surfs[i], (x, top + self.line_tops[i]))
+
         if self.thinking:
-            think = font.render("Thinking...", True, (150, 150, 255))
-            self.screen.blit(think, (chat_rect.x + 10, y))
+            self.screen.blit(surfs['think'], (x, top + self.content_height))
 
-        # 输入框内容
+        # 输入框内容（只有文字或光标变化时才重新渲染）
         cursor = "█" if (pygame.time.get_ticks() // 500) % 2 else ""
-        input_surf = font.render(self.input_text + cursor, True, (0, 0, 0))
-        self.screen.blit(input_surf, (input_rect.x + 10, input_rect.y + 5))
+        input_text = self.input_text + cursor
+        if input_text != self.input_surf_text:
+            self.input_surf = self.draw_font.render(input_text, True, (0, 0, 0))
+            self.input_surf_text = input_text
+        self.screen.blit(self.input_surf, (input_rect.x + 10, input_rect.y + 5))
 
         # 提示
-        hint = font.render("TAB to open | TAB to close | Enter to send", True, (150, 150, 150))
-        self.screen.blit(hint, (self.rect.x + 15, self.rect.y + self.rect.height - 20))
+        self.screen.blit(surfs['hint'], (self.rect.x + 15, self.rect.y + self.rect.height - 20))
 
     def wrap_text(self, text, max_width):
         words = text.split()
@@ -0,0 +1,99 @@
+import pygame
+from settings import *
+from assets import assets
+
+
+class Compositor:
+    """世界画完之后的全屏后处理。
+
+    天空颜色、睡觉淡出这些全屏乘法色调先用 multiply()/fade() 登记，
+    apply() 时合并成一次 BLEND_RGB_MULT；合并结果是纯白（不改变画面）就直接跳过。
+
+    夜里的点光源用 add_light() 登记，叠加到 LIGHT_MAP_SCALE 分之一大小的光照图上，
+    只把被照亮的那一块放大，和天空色调一起还是一次乘法混合。
+    """
+
+    def __init__(self, surface=None):
+        # 世界的渲染画布；RENDER_SCALE > 1 时比窗口小，色调也就便宜了
+        self.display_surface = surface or pygame.display.get_surface()
+        self.tint_surf = pygame.Surface(self.display_surface.get_size())
+        assets.track(self.tint_surf, 'compositor')
+        self.tint = (255, 255, 255)
+        # 淡出也会压暗灯光，所以和天空色调分开记
+        self.fade_tint = (255, 255, 255)
+
+        width, height = self.display_surface.get_size()
+        self.light_map = pygame.Surface((-(-width // LIGHT_MAP_SCALE), -(-height // LIGHT_MAP_SCALE)))
+        # (canvas pos, canvas radius, color)
+        self.lights = []
+        # (map radius, color) -> radial gradient stamp
+        self.light_stamps = {}
+
+    def clear(self):
+        self.tint = (255, 255, 255)
+        self.fade_tint = (255, 255, 255)
+        self.lights = []
+
+    def multiply(self, color):
+        r, g, b = self.tint
+        self.tint = (r * color[0] // 255, g * color[1] // 255, b * color[2] // 255)
+
+    def fade(self, color):
+        r, g, b = self.fade_tint
+        self.fade_tint = (r * color[0] // 255, g * color[1] // 255, b * color[2] // 255)
+
+    def add_light(self, pos, radius, color):
+        """pos 和 radius 都是渲染画布上的像素。"""
+        self.lights.append((pos, radius, color))
+
+    def light_stamp(self, radius, color):
+        stamp = self.light_stamps.get((radius, color))
+        if stamp is None:
+            stamp = pygame.Surface((radius * 2, radius * 2))
+            # 从外往里画，越靠近中心越亮
+            for step in range(radius, 0, -1):
+                strength = 1 - (step / radius) ** 2
+                pygame.draw.circle(stamp, [int(channel * strength) for channel in color], (radius, radius), step)
+            self.light_stamps[radius, color] = stamp
+        return stamp
+
+    def apply(self):
+        r, g, b = self.tint
+        fade = self.fade_tint
+        tint = (r * fade[0] // 255, g * fade[1] // 255, b * fade[2] // 255)
+
+        if tint != (255, 255, 255):
+            self.tint_surf.fill(tint)
+            if self.lights and self.tint != (255, 255, 255):
+                self.draw_lights(fade)
+            self.display_surface.blit(self.tint_surf, (0, 0), special_flags=pygame.BLEND_RGB_MULT)
+        self.clear()
+
+    def draw_lights(self, fade):
+        light_map = self.light_map
+        map_rect = light_map.get_rect()
+        lit = None
+        for (x, y), radius, color in self.lights:
+            stamp = self.light_stamp(max(1, radius // LIGHT_MAP_SCALE), color)
+            rect = stamp.get_rect(center=(x // LIGHT_MAP_SCALE, y // LIGHT_MAP_SCALE))
+            if not rect.colliderect(map_rect):
+                continue
+            if lit is None:
+                # 只有被照亮的那一块需要从天空色调重新开始
+                light_map.fill(self.tint)
+                lit = rect
+            else:
+                lit.union_ip(rect)
+            light_map.blit(stamp, rect, special_flags=pygame.BLEND_RGB_ADD)
+
+        if lit is None:
+            return
+        # 留一圈没有光的边，放大时和外面的纯色衔接
+        lit = lit.inflate(2, 2).clip(map_rect)
+        if fade != (255, 255, 255):
+            light_map.fill(fade, lit, special_flags=pygame.BLEND_RGB_MULT)
+
+        area = pygame.Rect(lit.x * LIGHT_MAP_SCALE, lit.y * LIGHT_MAP_SCALE,
+                           lit.width * LIGHT_MAP_SCALE, lit.height * LIGHT_MAP_SCALE)
+        area = area.clip(self.tint_surf.get_rect())
+        pygame.transform.smoothscale(light_map.subsurface(lit), area.size, self.tint_surf.subsurface(area))
@@ -5,8 +5,18 @@ from level import Level
 from chat import ChatBox
 
 class Game:
-    def __init__(self, screen, new_game=False, load_save=False):
+    """农场场景。
+
+    离开（ESC 回标题）时：Level——地图、精灵、烘焙好的图块、聊天记录——整个保留；
+    音效和音乐通道暂停，回来时接着放，dt 重新起算；没有要释放的东西，
+    所以来回进出不会重新载入，也不会多占内存。
+    """
+    keep_warm = True
+
+    def __init__(self, screen, back, new_game=False, load_save=False):
         self.screen = screen
+        self.back = back
+        # 只用来量 dt，限帧由 Main 做
         self.clock = pygame.time.Clock()
         
         # 关键修复：直接创建 Level，不传任何参数
@@ -17,25 +27,38 @@ class Game:
         #     self.level.load_game()
         
         self.chatbox = ChatBox(self.screen, SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.chat_repeat_disabled = False
+
+    def enter(self):
+        self.level.resume()
+        # 在标题画面待的时间不算进第一帧的 dt
+        self.clock.tick()
+
+    def exit(self, name):
+        self.level.suspend()
+        if self.chat_repeat_disabled:
+            pygame.key.set_repeat(150, 30)
+            self.chat_repeat_disabled = False
+
+    def update(self):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                self.back()  # 按 ESC 返回标题
+                return
+            self.chatbox.handle_event(event)
+
+        chatbox = self.level.chatbox
+        if chatbox.active and not self.chat_repeat_disabled:
+            pygame.key.set_repeat(0)  # Disable repeat for chat
+            self.chat_repeat_disabled = True
+        elif not chatbox.active and self.chat_repeat_disabled:
+            pygame.key.set_repeat(150, 30)  # Restore repeat for game
+            self.chat_repeat_disabled = False
 
-        pygame.mixer.music.stop()
-        pygame.mixer.music.unload()
-        #pygame.mixer.music.load('audio/bg.mp3')
-        #pygame.mixer.music.set_volume(0.4)
-        #pygame.mixer.music.play(-1)
-
-    def run(self):
-        while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-                    return  # 按 ESC 返回标题
-                self.chatbox.handle_event(event)
-
-            dt = self.clock.tick(60) / 1000.0
-            self.level.run(dt)
-            self.chatbox.update()
-            self.chatbox.draw()
-            pygame.display.update()
\ No newline at end of file
+        dt = self.clock.tick() / 1000.0
+        self.level.run(dt)
+        self.chatbox.update()
+        self.chatbox.draw()
@@ -0,0 +1,77 @@
+import os
+import time
+import pygame
+from settings import *
+from assets import assets
+from atlas import ATLAS_DIR
+from tilemap import load_map, reload_map
+
+# 监视的文件夹（相对项目根目录）；地图的 tmx/tsx 不管在哪都会监视
+WATCH_FOLDERS = ['graphics', 'audio']
+
+
+class HotReloader:
+    """开发模式热重载：每隔 HOT_RELOAD_INTERVAL 毫秒比较一次文件的修改时间。
+
+    地图（tmx、tsx、图块集图片）改了：重新载入地图，Level 只重建内容变了的那几组图层；
+    其他图片、声音改了：AssetManager 重新解码，尽量原地换掉正在用的表面和声音，再通知 listener。
+    玩家、耕地、背包都不动。
+    """
+
+    def __init__(self, level):
+        self.level = level
+        self.last_check = pygame.time.get_ticks()
+        self.mtimes = self.scan()
+
+    def watched_files(self):
+        files = set(load_map().files)
+        for folder in WATCH_FOLDERS:
+            for path, dirs, names in os.walk(os.path.join(assets.root, folder)):
+                # 图集是构建出来的，改的是原图
+                dirs[:] = [d for d in dirs if os.path.join(path, d) != ATLAS_DIR]
+                files.update(os.path.join(path, name) for name in names)
+        return files
+
+    def scan(self):
+        mtimes = {}
+        for file in self.watched_files():
+            try:
+                mtimes[file] = os.path.getmtime(file)
+            except OSError:
+                pass
+        return mtimes
+
+    def update(self):
+        now = pygame.time.get_ticks()
+        if now - self.last_check < HOT_RELOAD_INTERVAL:
+            return
+        self.last_check = now
+
+        mtimes = self.scan()
+        changed = {file for file, mtime in mtimes.items() if self.mtimes.get(file) != mtime}
+        self.mtimes = mtimes
+        if changed:
+            self.reload(changed)
+
+    def reload(self, changed):
+        start = time.perf_counter()
+
+        old_map = load_map()
+        if changed & old_map.files:
+            new_map = reload_map()
+            layers = set()
+            for name in set(old_map.layer_data) | set(new_map.layer_data):
+                if name not in old_map.layer_data or name not in new_map.layer_data:
+                    layers.add(name)
+                elif (old_map.layer_signature(name) != new_map.layer_signature(name)
+                      or changed & new_map.layer_files(name)):
+                    layers.add(name)
+            self.level.rebuild_map(new_map, layers)
+            # 地图可能换了图块集
+            self.mtimes = self.scan()
+
+        names = [os.path.relpath(file, assets.root).replace(os.sep, '/') for file in changed]
+        # Level 通过 assets 的 listener 重画用到这些资源的缓存
+        assets.reload([name for name in names if name.split('/')[0] in WATCH_FOLDERS])
+
+        print(f'Hot reload: {len(changed)} file(s) in {(time.perf_counter() - start) * 1000:.1f} ms')
@@ -4,9 +4,9 @@ from settings import *
 from random import randint
 from player import Player
 from overlay import Overlay
-from sprites import Generic, Water, WildFlower, Tree, Interaction, Particle
-from pytmx.util_pygame import load_pygame
-from support import import_folder
+from sprites import Generic, WildFlower, Tree, Interaction, ParticleSystem
+from tilemap import load_map
+from assets import assets
 from transition import Transition
 from soil import SoilLayer
 from sky import Rain, Sky
@@ -15,49 +15,90 @@ from save import SaveSystem
 from pet import Pet
 from chat import ChatBox
 from timer import Timer
+from camera import CameraGroup
+from bake import ChunkBaker, WaterLayer
+from compositor import Compositor
+from lighting import Lighting
+from minimap import Minimap
+from hotreload import HotReloader
+
+# 地图上按图层建出来的几组东西：组名 -> 用到的图层。热重载时只重建用到了改过图层的组
+MAP_GROUPS = {
+    'static': ('HouseFloor', 'HouseFurnitureBottom', 'HouseWalls', 'HouseFurnitureTop', 'Fence'),
+    'water': ('Water',),
+    'trees': ('Trees',),
+    'decoration': ('Decoration',),
+    'collision': ('Collision',),
+    'lights': ('Lights',),
+    'interactions': ('Player',),
+}
+# 小地图上画出来的图层
+MINIMAP_LAYERS = ('Water', 'HouseFloor', 'HouseWalls', 'Fence', 'Trees')
 
 
 class Level:
     def __init__(self):
         self.display_surface = pygame.display.get_surface()
 
+        # 世界的渲染画布：RENDER_SCALE > 1 时按内部分辨率画，再整数倍放大到窗口
+        if RENDER_SCALE == 1:
+            self.world_surface = self.display_surface
+        else:
+            self.world_surface = pygame.Surface((SCREEN_WIDTH // RENDER_SCALE, SCREEN_HEIGHT // RENDER_SCALE))
+            self.world_view = self.display_surface.subsurface(
+                (0, 0, self.world_surface.get_width() * RENDER_SCALE, self.world_surface.get_height() * RENDER_SCALE))
+            # 窗口大小不是 RENDER_SCALE 的整数倍时，右边和下边放大后盖不到的那一条每帧涂黑
+            view_width, view_height = self.world_view.get_size()
+            self.letterbox = [rect for rect in (pygame.Rect(view_width, 0, SCREEN_WIDTH - view_width, SCREEN_HEIGHT),
+                                                pygame.Rect(0, view_height, view_width, SCREEN_HEIGHT - view_height))
+                              if rect.width and rect.height]
 
         # 精灵组
-        self.all_sprites = CameraGroup()
+        self.all_sprites = CameraGroup(self.world_surface)
         self.collision_sprites = pygame.sprite.Group()
         self.tree_sprites = pygame.sprite.Group()
         self.interaction_sprites = pygame.sprite.Group()
 
         self.soil_layer = SoilLayer(self.all_sprites, self.collision_sprites)
+        self.particles = ParticleSystem(self.all_sprites)
 
         # 必须先加载地图和玩家
         self.setup()
 
         self.overlay = Overlay(self.player)
-        self.transition = Transition(self.reset, self.player)
+        self.overlays = [self.overlay]
+        if SPLIT_SCREEN:
+            self.overlays.append(Overlay(self.player2, (SCREEN_WIDTH // 2, 0)))
+        self.compositor = Compositor(self.world_surface)
+        self.transition = Transition(self.reset, self.players, self.compositor)
 
         self.rain = Rain(self.all_sprites)
         self.raining = randint(0, 10) > 7
         self.soil_layer.raining = self.raining
-        self.sky = Sky()
+        self.sky = Sky(self.compositor)
+        self.lighting = Lighting(self.compositor, self.all_sprites, self.players, self.light_sources)
 
         self.shop_active = False
 
+        # 商店/聊天打开时缓存的世界画面
+        self.frozen_frame = pygame.Surface(self.display_surface.get_size())
+        assets.track(self.frozen_frame, 'frames')
+        self.world_frozen = False
+
         # 音效（找不到也不崩溃）
         base_dir = os.path.dirname(__file__)
         success_path = os.path.join(base_dir, '..', 'audio', 'success.wav')
         music_path = os.path.join(base_dir, '..', 'audio', 'music.mp3')
 
         if os.path.exists(success_path):
-            self.success = pygame.mixer.Sound(success_path)
-            self.success.set_volume(0.3)
+            self.success = assets.sound('audio/success.wav', 0.3)
         else:
             self.success = None
 
         game_bgm = os.path.join(base_dir, '..', 'audio', 'music.mp3')
         if os.path.exists(game_bgm):
             pygame.mixer.Channel(0).stop()
-            self.game_music_sound = pygame.mixer.Sound(game_bgm)
+            self.game_music_sound = assets.sound('audio/music.mp3')
             self.game_music_channel = pygame.mixer.Channel(0)  # 用通道0
             self.game_music_channel.set_volume(0.1)
             self.game_music_channel.play(self.game_music_sound, loops=-1)
@@ -86,45 +127,20 @@ class Level:
 
         self.m_key_pressed = False
 
-    def setup(self):
-        tmx_data = load_pygame(os.path.join(os.path.dirname(__file__), '..', 'data', 'map.tmx'))
+        # 开发模式：改了图片、声音、地图不用重启
+        self.hot_reloader = HotReloader(self) if HOT_RELOAD else None
+        if HOT_RELOAD:
+            assets.add_listener(self.reload_assets)
 
-        # House bottom
-        for layer in ['HouseFloor', 'HouseFurnitureBottom']:
-            for x, y, surf in tmx_data.get_layer_by_name(layer).tiles():
-                Generic((x * TILE_SIZE, y * TILE_SIZE), surf, self.all_sprites, LAYERS['house bottom'])
+    def setup(self):
+        tmx_data = load_map()
 
-        # House top
-        for layer in ['HouseWalls', 'HouseFurnitureTop']:
-            for x, y, surf in tmx_data.get_layer_by_name(layer).tiles():
-                Generic((x * TILE_SIZE, y * TILE_SIZE), surf, self.all_sprites)
+        # 地图上的东西按 MAP_GROUPS 分组建，每组建出来的精灵记下来，热重载时整组换掉
+        self.map_sprites = {}
+        for group in ('static', 'water', 'trees', 'decoration', 'collision', 'lights'):
+            self.map_sprites[group] = getattr(self, f'create_{group}')(tmx_data)
 
-        # Fence
-        for x, y, surf in tmx_data.get_layer_by_name('Fence').tiles():
-            Generic((x * TILE_SIZE, y * TILE_SIZE), surf, [self.all_sprites, self.collision_sprites])
-
-        # Water
-        water_frames = import_folder(os.path.join(os.path.dirname(__file__), '..', 'graphics', 'water'))
-        for x, y, surf in tmx_data.get_layer_by_name('Water').tiles():
-            Water((x * TILE_SIZE, y * TILE_SIZE), water_frames, self.all_sprites)
-
-        # Trees
-        for obj in tmx_data.get_layer_by_name('Trees'):
-            Tree(pos=(obj.x, obj.y),
-                 surf=obj.image,
-                 groups=[self.all_sprites, self.collision_sprites, self.tree_sprites],
-                 name=obj.name,
-                 player_add=self.player_add)
-
-        # Decoration
-        for obj in tmx_data.get_layer_by_name('Decoration'):
-            WildFlower((obj.x, obj.y), obj.image, [self.all_sprites, self.collision_sprites])
-
-        # Invisible collision
-        for x, y, surf in tmx_data.get_layer_by_name('Collision').tiles():
-            Generic((x * TILE_SIZE, y * TILE_SIZE), pygame.Surface((TILE_SIZE, TILE_SIZE)), self.collision_sprites)
-
-        # Player & interactions
+        # Player
         for obj in tmx_data.get_layer_by_name('Player'):
             if obj.name == 'Start':
                 self.player = Player(
@@ -135,14 +151,23 @@ class Level:
                     interaction=self.interaction_sprites,
                     soil_layer=self.soil_layer,
                     toggle_shop=self.toggle_shop)
-            if obj.name == 'Bed':
-                Interaction((obj.x, obj.y), (obj.width, obj.height), self.interaction_sprites, 'Bed')
-            if obj.name == 'Trader':
-                Interaction((obj.x, obj.y), (obj.width, obj.height), self.interaction_sprites, 'Trader')
+                self.players = [self.player]
+                if SPLIT_SCREEN:
+                    self.player2 = Player(
+                        pos=(obj.x + TILE_SIZE, obj.y),
+                        group=self.all_sprites,
+                        collision_sprites=self.collision_sprites,
+                        tree_sprites=self.tree_sprites,
+                        interaction=self.interaction_sprites,
+                        soil_layer=self.soil_layer,
+                        toggle_shop=self.toggle_shop,
+                        keymap=PLAYER_KEYS[1])
+                    self.players.append(self.player2)
+        self.map_sprites['interactions'] = self.create_interactions(tmx_data)
 
         # Ground
         Generic(pos=(0, 0),
-                surf=pygame.image.load(os.path.join(os.path.dirname(__file__), '..', 'graphics', 'world', 'ground.png')).convert_alpha(),
+                surf=assets.image('graphics/world/ground.png'),
                 groups=self.all_sprites,
                 z=LAYERS['ground'])
 
@@ -150,15 +175,132 @@ class Level:
         Pet(self.player, self.all_sprites)   
 
         self.menu = Menu(self.player, self.toggle_shop)
+        self.minimap = Minimap(tmx_data, self.soil_layer, self.players)
+
+        # 视口：(玩家, 在世界画布上的区域)，分屏时左右各一半
+        width, height = self.world_surface.get_size()
+        if SPLIT_SCREEN:
+            self.viewports = [(self.player, pygame.Rect(0, 0, width // 2, height)),
+                              (self.player2, pygame.Rect(width // 2, 0, width - width // 2, height))]
+        else:
+            self.viewports = [(self.player, pygame.Rect(0, 0, width, height))]
+
+    def create_static(self, tmx_data):
+        # 静态地块不再一块一个精灵，而是合成成大块表面
+        baker = ChunkBaker()
+        fences = []
+
+        # House bottom
+        for layer in ['HouseFloor', 'HouseFurnitureBottom']:
+            for x, y, surf in tmx_data.get_layer_by_name(layer).tiles():
+                baker.add((x * TILE_SIZE, y * TILE_SIZE), surf, LAYERS['house bottom'])
 
-    def player_add(self, item):
-        self.player.item_inventory[item] += 1
+        # House top
+        for layer in ['HouseWalls', 'HouseFurnitureTop']:
+            for x, y, surf in tmx_data.get_layer_by_name(layer).tiles():
+                baker.add((x * TILE_SIZE, y * TILE_SIZE), surf, LAYERS['main'], y_sort=True)
+
+        # Fence（碰撞体单独保留，画面合成进横条）
+        for x, y, surf in tmx_data.get_layer_by_name('Fence').tiles():
+            baker.add((x * TILE_SIZE, y * TILE_SIZE), surf, LAYERS['main'], y_sort=True)
+            fences.append(Generic((x * TILE_SIZE, y * TILE_SIZE), surf, self.collision_sprites))
+
+        return baker.bake(self.all_sprites) + fences
+
+    def create_water(self, tmx_data):
+        water_frames = assets.frames('graphics/water')
+        water_tiles = [(x * TILE_SIZE, y * TILE_SIZE) for x, y, _ in tmx_data.get_layer_by_name('Water').tiles()]
+        self.water = WaterLayer(water_tiles, water_frames, self.all_sprites)
+        return list(self.water.chunks)
+
+    def create_trees(self, tmx_data):
+        return [Tree(pos=(obj.x, obj.y),
+                     surf=obj.image,
+                     groups=[self.all_sprites, self.collision_sprites, self.tree_sprites],
+                     name=obj.name,
+                     player_add=self.player_add,
+                     particles=self.particles)
+                for obj in tmx_data.get_layer_by_name('Trees')]
+
+    def create_decoration(self, tmx_data):
+        return [WildFlower((obj.x, obj.y), obj.image, [self.all_sprites, self.collision_sprites])
+                for obj in tmx_data.get_layer_by_name('Decoration')]
+
+    def create_collision(self, tmx_data):
+        # Invisible collision：从来不画，所有格子共用一张空白表面
+        blank = pygame.Surface((TILE_SIZE, TILE_SIZE))
+        return [Generic((x * TILE_SIZE, y * TILE_SIZE), blank, self.collision_sprites)
+                for x, y, _ in tmx_data.get_layer_by_name('Collision').tiles()]
+
+    def create_lights(self, tmx_data):
+        # Lights（可选的图层：灯的位置，radius/颜色可以写在对象属性里）
+        try:
+            light_layer = tmx_data.get_layer_by_name('Lights')
+        except ValueError:
+            light_layer = []
+        sources = []
+        for obj in light_layer:
+            center = (obj.x + obj.width / 2, obj.y + obj.height / 2)
+            radius = int(obj.properties.get('radius', LIGHT_RADIUS))
+            # Tiled 的颜色属性是 '#AARRGGBB'，只取 RGB
+            color = obj.properties.get('color')
+            color = pygame.Color('#' + color[-6:]) if color else pygame.Color(LIGHT_COLOR)
+            sources.append((center, radius, (color.r, color.g, color.b)))
+        self.light_sources = sources
+        return []
+
+    def create_interactions(self, tmx_data):
+        interactions = []
+        for obj in tmx_data.get_layer_by_name('Player'):
+            if obj.name in ('Bed', 'Trader'):
+                interactions.append(Interaction((obj.x, obj.y), (obj.width, obj.height), self.interaction_sprites, obj.name))
+        return interactions
+
+    # ---------- 开发模式热重载 ----------
+    def rebuild_group(self, group, tmx_data):
+        for sprite in self.map_sprites[group]:
+            if isinstance(sprite, Tree):
+                for apple in sprite.apple_sprites:
+                    apple.kill()
+            sprite.kill()
+        self.map_sprites[group] = getattr(self, f'create_{group}')(tmx_data)
+        if group == 'lights':
+            self.lighting.set_sources(self.light_sources)
+
+    def rebuild_map(self, tmx_data, layers):
+        """地图改过之后：只重建用到了改过图层（layers）的那几组，玩家、耕地、背包都不动。"""
+        for group, group_layers in MAP_GROUPS.items():
+            if layers.intersection(group_layers):
+                self.rebuild_group(group, tmx_data)
+
+        if layers.intersection(MINIMAP_LAYERS):
+            self.soil_layer.listeners.remove(self.minimap.patch)
+            self.minimap = Minimap(tmx_data, self.soil_layer, self.players)
+        if 'Farmable' in layers:
+            print("Hot reload: the Farmable layer changed, restart to rebuild the soil grid")
+
+    def reload_assets(self, keys):
+        """assets 的 listener，图片改过之后：重画用到它们的缓存表面（缩放过的图、水面、耕地块）。"""
+        self.all_sprites.scaled_images.clear()
+        names = {key[1] for key in keys}
+        if 'graphics/water' in names:
+            self.rebuild_group('water', load_map())
+        if names.intersection(('graphics/soil', 'graphics/soil_water')):
+            grid = self.soil_layer.grid
+            self.soil_layer.patch_tiles([(x, y) for y, row in enumerate(grid) for x, cell in enumerate(row)
+                                         if 'X' in cell or 'W' in cell])
+
+    def player_add(self, item, player=None):
+        (player or self.player).item_inventory[item] += 1
         if self.success:
             self.success.play()
 
-    def toggle_shop(self):
+    def toggle_shop(self, player=None):
+        """打开时商店给 player（在商人旁边按交互键的那个，M 键默认 1P）用。"""
         print("Toggling shop menu.")
         self.shop_active = not self.shop_active
+        if self.shop_active:
+            self.menu.player = player or self.player
 
     def next_day(self):
         if hasattr(self, 'sky'):
@@ -188,16 +330,41 @@ class Level:
     def plant_collision(self):
         if self.soil_layer.plant_sprites:
             for plant in self.soil_layer.plant_sprites.sprites():
-                if plant.harvestable and plant.rect.colliderect(self.player.plant_collision_rect):
-                    self.player_add(plant.plant_type)
+                if not plant.harvestable:
+                    continue
+                index = plant.rect.collidelist([player.plant_collision_rect for player in self.players])
+                if index != -1:
+                    self.player_add(plant.plant_type, self.players[index])
                     plant.kill()
-                    Particle(plant.rect.topleft, plant.image, self.all_sprites, LAYERS['main'])
-                    row = plant.rect.centery // TILE_SIZE
-                    col = plant.rect.centerx // TILE_SIZE
-                    if 'P' in self.soil_layer.grid[row][col]:
-                        self.soil_layer.grid[row][col].remove('P')
+                    self.particles.spawn(plant.rect.topleft, plant.image, LAYERS['main'])
+                    self.soil_layer.harvest(plant)
+
+    def load_save(self):
+        """在已经在跑的农场上重新读存档。读成功了耕地换成存档里的，存档里没有植物，
+        这次种下的清掉，和新建时读档一样；没有存档或者读失败时这次的农场原样不动。"""
+        if not self.save_system.load_game(self.player, self):
+            return False
+        for plant in self.soil_layer.plant_sprites.sprites():
+            plant.kill()
+        return True
+
+    def suspend(self):
+        """离开农场（回标题）：所有音效通道连同背景音乐一起暂停。"""
+        pygame.mixer.pause()
+
+    def resume(self):
+        pygame.mixer.unpause()
+
+    def present_world(self):
+        if self.world_surface is not self.display_surface:
+            pygame.transform.scale(self.world_surface, self.world_view.get_size(), self.world_view)
+            for rect in self.letterbox:
+                self.display_surface.fill('black', rect)
 
     def run(self, dt):
+        if self.hot_reloader:
+            self.hot_reloader.update()
+
         # 1. 事件处理（必须最先）
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -213,9 +380,13 @@ class Level:
             if event.type == pygame.KEYDOWN and event.key == pygame.K_x:
                 self.save_system.save_game(self.player, self)            
 
-        # 2. 背景绘制
-        self.display_surface.fill('black')
-        self.all_sprites.custom_draw(self.player)
+        # 2. 背景绘制：商店/聊天开着时世界是静止的，之后直接贴冻结那一刻截下的画面
+        use_frozen = self.world_frozen and (self.shop_active or self.chatbox.active)
+        if not use_frozen:
+            self.world_surface.fill('black')
+            for player, rect in self.viewports:
+                self.all_sprites.custom_draw(player, rect)
+                self.lighting.display()
 
         # 3. 按键检测：M 开商店 + TAB 开聊天（防连点）
         keys = pygame.key.get_pressed()
@@ -241,7 +412,9 @@ class Level:
         else:
             # 只有彻底自由时才更新游戏世界
             self.plant_collision()
-            self.all_sprites.update(dt)            
+            self.all_sprites.update(dt)
+            self.water.update(dt)
+            self.particles.update(dt)            
 
         # 5. 天空与雨：只在非菜单状态更新
         if not self.shop_active and not self.chatbox.active:
@@ -268,13 +441,32 @@ class Level:
                 self.sky.set_time(1.0)
                 
             self.sky.display(dt)
-            if self.raining:
-                self.rain.update()
-        else:
+            self.rain.update(dt, self.raining)
+            self.world_frozen = False
+        elif not self.world_frozen:
             self.sky.display(0)
 
-        # 6. UI 永远最上层绘制
-        self.overlay.display()
+        # 6. 睡觉过渡，和天空色调一起做一次全屏混合，然后放大到窗口
+        if any(player.sleep for player in self.players):
+            self.transition.play()
+        if use_frozen:
+            self.compositor.clear()
+            self.display_surface.blit(self.frozen_frame, (0, 0))
+        else:
+            self.compositor.apply()
+            self.present_world()
+            if SPLIT_SCREEN:
+                self.display_surface.fill('black', (SCREEN_WIDTH // 2 - 1, 0, 2, SCREEN_HEIGHT))
+            self.all_sprites.draw_bubbles(self.display_surface)
+            if self.shop_active or self.chatbox.active:
+                # 刚冻结：把整帧存起来，之后只重画 UI
+                self.frozen_frame.blit(self.display_surface, (0, 0))
+                self.world_frozen = True
+
+        # 7. UI 永远最上层绘制
+        for overlay in self.overlays:
+            overlay.display()
+        self.minimap.display()
 
         if self.shop_active:
             self.menu.update()
@@ -282,48 +474,4 @@ class Level:
         self.chatbox.update()   # 更新思考状态、接收回复
         self.chatbox.draw()     # 绘制聊天框
 
-        # 7. 睡觉过渡
-        if self.player.sleep:
-            self.transition.play()
-
-        self.save_system.draw_message()     
-
-class CameraGroup(pygame.sprite.Group):
-    def __init__(self):
-        super().__init__()
-        self.display_surface = pygame.display.get_surface()
-        self.offset = pygame.math.Vector2()
-
-        # 可选：如果你还想画大背景地面，就留着这几行
-        # self.ground_surf = pygame.image.load('../graphics/world/ground.png').convert_alpha()
-        # self.ground_rect = self.gound_surf.get_rect(topleft=(0, 0))
-
-    def custom_draw(self, player):
-        # 相机以玩家为中心
-        self.offset.x = player.rect.centerx - SCREEN_WIDTH / 2
-        self.offset.y = player.rect.centery - SCREEN_HEIGHT / 2
-
-        # 可选：绘制超大背景地面（如果你有的话）
-        # ground_offset = self.ground_rect.topleft - self.offset
-        # self.display_surface.blit(self.ground_surf, ground_offset)
-
-        # 核心：按层级 + Y轴排序绘制（Y轴越小越在后面，完美实现前后遮挡）
-        for sprite in sorted(self.sprites(), key=lambda s: (s.z, s.rect.centery)):
-            offset_rect = sprite.rect.copy()
-            offset_rect.center -= self.offset
-            self.display_surface.blit(sprite.image, offset_rect)
-
-            # Draw dialogue bubble if sprite provides one
-            if hasattr(sprite, 'get_dialogue_surf'):
-                try:
-                    bubble_surf = sprite.get_dialogue_surf()
-                    if bubble_surf:
-                        bubble_rect = bubble_surf.get_rect()
-                        bubble_rect.midbottom = (offset_rect.centerx, offset_rect.top - 10)
-                        self.display_surface.blit(bubble_surf, bubble_rect)
-                except Exception:
-                    pass
-
-
-
-
+        self.save_system.draw_message()
@@ -0,0 +1,38 @@
+import pygame
+from settings import *
+
+
+class Lighting:
+    """夜里的光源：玩家的火把，加上地图 'Lights' 图层里摆的灯。
+
+    每个视口画完后调用 display()，把它镜头范围内的光源交给 Compositor，由它合成低分辨率光照图。
+    白天天空色调是纯白，Compositor 会直接跳过，灯光不花任何开销。
+    """
+
+    def __init__(self, compositor, camera, players, sources=()):
+        self.compositor = compositor
+        self.camera = camera
+        self.players = players
+        self.set_sources(sources)
+
+    def set_sources(self, sources):
+        """地图上的灯：(center, radius, color) 的列表。"""
+        # (world rect, radius, color)
+        self.sources = [(pygame.Rect(pos[0] - radius, pos[1] - radius, radius * 2, radius * 2), radius, color)
+                        for pos, radius, color in sources]
+
+    def add(self, center, radius, color):
+        camera = self.camera
+        scale = camera.scale
+        origin_x, origin_y = camera.origin
+        pos = (origin_x + (center[0] - camera.offset_x) // scale, origin_y + (center[1] - camera.offset_y) // scale)
+        self.compositor.add_light(pos, radius // scale, color)
+
+    def display(self):
+        view = self.camera.view
+        for rect, radius, color in self.sources:
+            if rect.colliderect(view):
+                self.add(rect.center, radius, color)
+        for player in self.players:
+            if player.rect.colliderect(view):
+                self.add(player.rect.center, PLAYER_LIGHT_RADIUS, PLAYER_LIGHT_COLOR)
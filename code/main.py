@@ -1,8 +1,14 @@
 # main.py
+from startup import startup   # 最先导入：启动计时从这里开始
+import os
 import pygame
 from settings import *
-from start import *  
-from game import Game
+from start import StartMenu
+from support import get_font, render_text
+from preload import Preloader, update_manifest
+from scene import SceneManager
+
+startup.lap('import')
 
 # 让 start.py 能调用到 Main 实例
 main_instance = None
@@ -12,66 +18,76 @@ class Main:
         global main_instance
         main_instance = self
 
-        pygame.init()
-        pygame.mixer.init()
-        pygame.key.set_repeat(150, 30)
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption('Farming Land')
-
-        # 场景
-        self.start_menu = StartMenu(self.screen, self.start_game)
-        self.controls = None
-        self.game = None
-        self.current_scene = 'start'   # 'start' / 'game' / 'controls'
-
-        self.chat_repeat_disabled = False    
+        with startup.measure('display init'):
+            pygame.init()
+            pygame.mixer.init()
+            pygame.key.set_repeat(150, 30)
+            flags = DISPLAY_FLAGS | (pygame.SCALED if VSYNC else 0)
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), flags, vsync=int(VSYNC))
+            pygame.display.set_caption('Farming Land')
+
+        # 场景：标题一直保留；农场第一次开始游戏时才创建，之后也一直保留
+        with startup.measure('title screen'):
+            self.start_menu = StartMenu(self.screen, self.start_game)
+            # 标题画面一出来就开始在后台解码进游戏要用的资源
+            self.preloader = Preloader()
+        self.scenes = SceneManager()
+        self.scenes.register('start', lambda: self.start_menu)
+        self.scenes.register('controls', lambda: ControlsScreen(self.screen, self.back_to_start))
+        self.scenes.register('game', self.create_game)
+        self.scenes.switch('start')
+
+        # 标题/操作说明界面也限帧，不再空转占满一个核
+        self.clock = pygame.time.Clock()
+
+    def create_game(self):
+        # game 会把 level 和所有子系统一起导进来，点了开始游戏才需要
+        from game import Game
+        self.preloader.finish()
+        game = Game(self.screen, self.back_to_start)
+        update_manifest()
+        return game
 
     def start_game(self, new_game=False, load_save=False):
-        # 目前 Level 不支持参数，直接忽略也没事
-        self.game = Game(self.screen)
-        self.current_scene = 'game'
+        # 从标题回来时接着上次离开的农场；第一次进来 Level 自己会读存档，
+        # 之后选 Load Game 才在已有的农场上重新读一次
+        warm = 'game' in self.scenes.scenes
+        self.scenes.switch('game')
+        if load_save and warm:
+            self.scenes.current.level.load_save()
 
     def show_controls(self):
-        self.controls = ControlsScreen(self.screen, self.back_to_start)
-        self.current_scene = 'controls'
+        self.scenes.switch('controls')
 
     def back_to_start(self):
-        self.current_scene = 'start'
+        # 在农场里才第一次用到的（种下的作物、砍树……）也记进预加载清单
+        update_manifest()
+        self.scenes.switch('start')
 
     def run(self):
         while True:
-            self.screen.fill((0, 0, 0))   # 防止残影
-
-            if self.current_scene == 'start':
-                self.start_menu.update()
-
-            elif self.current_scene == 'controls':
-                self.controls.update()
-
-            elif self.current_scene == 'game':
-                chatbox = self.game.level.chatbox if self.game and hasattr(self.game, 'level') else None
-                if chatbox and chatbox.active and not self.chat_repeat_disabled:
-                    pygame.key.set_repeat(0)  # Disable repeat for chat
-                    self.chat_repeat_disabled = True
-                elif (not chatbox or not chatbox.active) and self.chat_repeat_disabled:
-                    pygame.key.set_repeat(150, 30)  # Restore repeat for game
-                    self.chat_repeat_disabled = False                
-                self.game.run()                     # 按 ESC 会 return
-                self.current_scene = 'start' 
-                
-                pygame.mixer.Channel(0).stop()
-                pygame.mixer.music.load(os.path.join('audio', 'title.ogg'))
-                pygame.mixer.music.play(-1)       # 游戏结束后回到标题
+            self.scenes.update()
+            if self.scenes.name == 'start' and not self.preloader.done:
+                with startup.measure('assets'):
+                    self.preloader.pump()
 
             pygame.display.update()
+            if not startup.finished:
+                startup.finish()
+                if STARTUP_REPORT:
+                    print(startup.report())
+            self.clock.tick(FPS)
 
 # ===== ControlsScreen（直接写在这里最简单，也可放 start.py）=====
 class ControlsScreen:
+    # 只有两个共享字体，离开就丢掉，下次重新建
+    keep_warm = False
+
     def __init__(self, screen, back_callback):
         self.screen = screen
         self.back = back_callback
-        self.font_big = pygame.font.Font(os.path.join('font', 'LycheeSoda.ttf'), 70)
-        self.font = pygame.font.Font(os.path.join('font', 'LycheeSoda.ttf'), 42)
+        self.font_big = get_font(os.path.join('font', 'LycheeSoda.ttf'), 70)
+        self.font = get_font(os.path.join('font', 'LycheeSoda.ttf'), 42)
 
     def handle_event(self, event):
         if event.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN):
@@ -87,7 +103,7 @@ class ControlsScreen:
     def draw(self):
         self.screen.fill((30, 35, 60))
 
-        title = self.font_big.render("Controls", True, (200, 255, 200))
+        title = render_text(self.font_big, "Controls", (200, 255, 200))
         self.screen.blit(title, title.get_rect(center=(SCREEN_WIDTH//2, 100)))
 
         lines = [
@@ -106,7 +122,7 @@ class ControlsScreen:
 
         for i, text in enumerate(lines):
             color = (255, 255, 180) if i < 9 else (180, 180, 180)
-            surf = self.font.render(text, True, color)
+            surf = render_text(self.font, text, color)
             rect = surf.get_rect(center=(SCREEN_WIDTH//2, 220 + i * 52))
             self.screen.blit(surf, rect)
 
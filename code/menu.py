@@ -1,13 +1,14 @@
 import pygame
 from settings import *
 from timer import Timer
+from support import get_font, render_text
 import os
 class Menu:
 	def __init__(self, player, toggle_menu):
 		self.player = player
 		self.toggle_menu = toggle_menu
 		self.display_surface = pygame.display.get_surface()
-		self.font = pygame.font.Font(os.path.join(os.path.dirname(__file__), '..', 'font', 'LycheeSoda.ttf'), 30)
+		self.font = get_font(os.path.join(os.path.dirname(__file__), '..', 'font', 'LycheeSoda.ttf'), 30)
 
 		self.width = 400
 		self.space = 10
@@ -21,7 +22,7 @@ class Menu:
 		self.timer = Timer(200)
 
 	def display_money(self):
-		text_surf = self.font.render(f'${self.player.money}', False, 'Black')
+		text_surf = render_text(self.font, f'${self.player.money}', 'Black', False)
 		text_rect = text_surf.get_rect(midbottom = (SCREEN_WIDTH / 2,SCREEN_HEIGHT - 20))
 		pygame.draw.rect(self.display_surface,'White',text_rect.inflate(10,10),0,4)
 		self.display_surface.blit(text_surf,text_rect)
@@ -97,7 +98,7 @@ class Menu:
 		pygame.draw.rect(self.display_surface, 'White',bg_rect, 0, 4)
 		text_rect = text_surf.get_rect(midleft = (self.main_rect.left + 20,bg_rect.centery))
 		self.display_surface.blit(text_surf, text_rect)
-		amount_surf = self.font.render(str(amount), False, 'Black')
+		amount_surf = render_text(self.font, str(amount), 'Black', False)
 		amount_rect = amount_surf.get_rect(midright = (self.main_rect.right - 20,bg_rect.centery))
 		self.display_surface.blit(amount_surf, amount_rect)
 		if selected:
@@ -0,0 +1,63 @@
+import pygame
+from settings import *
+
+
+class Minimap:
+    """右上角的小地图。
+
+    地形（水、房子、栅栏、树）只在创建时从 TMX 画一次；
+    耕地的状态通过 SoilLayer 的 listener 按格子补画，
+    所以每帧只有一次小 blit 加上玩家点。
+    """
+
+    def __init__(self, tmx_data, soil_layer, players):
+        self.display_surface = pygame.display.get_surface()
+        self.soil_layer = soil_layer
+        self.players = players
+        self.tile_size = MINIMAP_TILE_SIZE
+        self.border = MINIMAP_BORDER
+
+        rows, cols = len(soil_layer.grid), len(soil_layer.grid[0])
+        self.surface = pygame.Surface((cols * self.tile_size + self.border * 2, rows * self.tile_size + self.border * 2))
+        self.surface.fill(MINIMAP_COLORS['border'])
+        self.surface.fill(MINIMAP_COLORS['ground'], self.surface.get_rect().inflate(-self.border * 2, -self.border * 2))
+        self.rect = self.surface.get_rect(topright=(SCREEN_WIDTH - MINIMAP_MARGIN, MINIMAP_MARGIN))
+
+        for layer, color in (('Water', 'water'), ('HouseFloor', 'house'), ('HouseWalls', 'house'), ('Fence', 'fence')):
+            for x, y, _ in tmx_data.get_layer_by_name(layer).tiles():
+                self.fill_tile(x, y, color)
+
+        # 树画在树干的位置
+        for obj in tmx_data.get_layer_by_name('Trees'):
+            self.fill_tile(int(obj.x + obj.width / 2) // TILE_SIZE, int(obj.y + obj.height - 1) // TILE_SIZE, 'tree')
+
+        self.patch([(rect.x // TILE_SIZE, rect.y // TILE_SIZE) for rect in soil_layer.hit_rects])
+        soil_layer.add_listener(self.patch)
+
+    def fill_tile(self, x, y, color):
+        self.surface.fill(MINIMAP_COLORS[color], (self.border + x * self.tile_size, self.border + y * self.tile_size, self.tile_size, self.tile_size))
+
+    def patch(self, tiles):
+        grid = self.soil_layer.grid
+        for x, y in tiles:
+            if not (0 <= y < len(grid) and 0 <= x < len(grid[0])):
+                continue
+            cell = grid[y][x]
+            if 'F' not in cell:
+                continue
+            if 'P' in cell:
+                color = 'plant'
+            elif 'W' in cell:
+                color = 'watered'
+            elif 'X' in cell:
+                color = 'tilled'
+            else:
+                color = 'farmable'
+            self.fill_tile(x, y, color)
+
+    def display(self):
+        self.display_surface.blit(self.surface, self.rect)
+        for player in self.players:
+            x = self.rect.x + self.border + player.rect.centerx * self.tile_size // TILE_SIZE
+            y = self.rect.y + self.border + player.rect.centery * self.tile_size // TILE_SIZE
+            self.display_surface.fill(MINIMAP_COLORS['player'], (x - 1, y - 1, self.tile_size, self.tile_size))
@@ -1,33 +1,28 @@
 import pygame
-import os
 from settings import *
+from assets import assets
 
 class Overlay:
-	def __init__(self,player):
+	def __init__(self,player,offset=(0,0)):
 
 		# general setup
 		self.display_surface = pygame.display.get_surface()
 		self.player = player
+		# 分屏时第二个玩家的工具栏画在自己那半边
+		self.offset = Vector2(offset)
 
 		# imports 
-		overlay_path = os.path.join(os.path.dirname(__file__), '..', 'graphics', 'overlay')
-		self.tools_surf = {
-            tool: pygame.image.load(os.path.join(overlay_path, f'{tool}.png')).convert_alpha()
-            for tool in player.tools
-        }
-		self.seeds_surf = {
-            seed: pygame.image.load(os.path.join(overlay_path, f'{seed}.png')).convert_alpha()
-            for seed in player.seeds
-        }
+		self.tools_surf = {tool: assets.image(f'graphics/overlay/{tool}.png') for tool in player.tools}
+		self.seeds_surf = {seed: assets.image(f'graphics/overlay/{seed}.png') for seed in player.seeds}
 
 	def display(self):
 
 		# tool
 		tool_surf = self.tools_surf[self.player.selected_tool]
-		tool_rect = tool_surf.get_rect(midbottom = OVERLAY_POSITIONS['tool'])
+		tool_rect = tool_surf.get_rect(midbottom = OVERLAY_POSITIONS['tool'] + self.offset)
 		self.display_surface.blit(tool_surf,tool_rect)
 
 		# seeds
 		seed_surf = self.seeds_surf[self.player.selected_seed]
-		seed_rect = seed_surf.get_rect(midbottom = OVERLAY_POSITIONS['seed'])
+		seed_rect = seed_surf.get_rect(midbottom = OVERLAY_POSITIONS['seed'] + self.offset)
 		self.display_surface.blit(seed_surf,seed_rect)
\ No newline at end of file
@@ -1,8 +1,10 @@
 import pygame
 from settings import *
 import os
-from support import import_folder
+from support import get_font
+from assets import assets
 from random import randint, choice
+from collections import OrderedDict
 
 class Pet(pygame.sprite.Sprite):
     def __init__(self, player, groups):
@@ -33,8 +35,7 @@ class Pet(pygame.sprite.Sprite):
         self.follow_distance = 60
 
         # 加载气泡图片
-        bubble_path = os.path.join(os.path.dirname(__file__), '..', 'graphics', 'pet', 'bubble.png')
-        self.bubble_img = pygame.image.load(bubble_path).convert_alpha()
+        self.bubble_img = assets.image('graphics/pet/bubble.png')
 
         # 英文对话列表
         self.dialogues = [
@@ -51,17 +52,15 @@ class Pet(pygame.sprite.Sprite):
         ]
         self.dialogue_text = ""
         self.show_dialogue = False
+        self.bubble_cache = OrderedDict()
         self.dialogue_timer = 0
         self.dialogue_display_time = 0
         self.next_dialogue_time = randint(300, 600)
-        self.font = pygame.font.Font(os.path.join(os.path.dirname(__file__), '..', 'font', 'LycheeSoda.ttf'), 20)
+        self.font = get_font(os.path.join(os.path.dirname(__file__), '..', 'font', 'LycheeSoda.ttf'), 20)
 
     def import_assets(self):
-        idle_path = os.path.join(os.path.dirname(__file__), '..', 'graphics', 'pet', 'idle')
-        walk_path = os.path.join(os.path.dirname(__file__), '..', 'graphics', 'pet', 'walk')
-        
-        right_idle = import_folder(idle_path)
-        right_walk = import_folder(walk_path)
+        right_idle = assets.frames('graphics/pet/idle')
+        right_walk = assets.frames('graphics/pet/walk')
         
         left_walk = [pygame.transform.flip(frame, True, False) for frame in right_walk]
         up_walk = right_walk
@@ -108,7 +107,20 @@ class Pet(pygame.sprite.Sprite):
         if not self.show_dialogue:
             return None
 
-        text_surf = self.font.render(self.dialogue_text, True, (50, 50, 50))
+        # 同一句话的气泡只做一次，最近用过的留在缓存里
+        bubble_surf = self.bubble_cache.get(self.dialogue_text)
+        if bubble_surf is not None:
+            self.bubble_cache.move_to_end(self.dialogue_text)
+            return bubble_surf
+
+        bubble_surf = self.create_bubble(self.dialogue_text)
+        self.bubble_cache[self.dialogue_text] = bubble_surf
+        if len(self.bubble_cache) > BUBBLE_CACHE_SIZE:
+            self.bubble_cache.popitem(last=False)
+        return bubble_surf
+
+    def create_bubble(self, text):
+        text_surf = self.font.render(text, True, (50, 50, 50))
         text_rect = text_surf.get_rect()
 
         # 目标气泡宽高：比文字略大
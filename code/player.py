@@ -1,12 +1,12 @@
 import pygame
 from settings import *
 from support import *
-import os
 from timer import Timer
+from assets import assets
 from sprites import Tree
 
 class Player(pygame.sprite.Sprite):
-	def __init__(self, pos, group, collision_sprites, tree_sprites, interaction, soil_layer, toggle_shop):
+	def __init__(self, pos, group, collision_sprites, tree_sprites, interaction, soil_layer, toggle_shop, keymap=None):
 		super().__init__(group)
 
 		keys = pygame.key.get_pressed()
@@ -67,9 +67,11 @@ class Player(pygame.sprite.Sprite):
 		self.soil_layer = soil_layer
 		self.toggle_shop = toggle_shop
 
+		# controls (PLAYER_KEYS)
+		self.keymap = keymap or PLAYER_KEYS[0]
+
 		# sound
-		self.watering = pygame.mixer.Sound(os.path.join(os.path.dirname(__file__), '..', 'audio', 'water.mp3'))
-		self.watering.set_volume(0.2)
+		self.watering = assets.sound('audio/water.mp3', 0.2)
 
 		self.plant_collision_rect = self.rect.inflate(-self.rect.width * 0.4, -self.rect.height * 0.4)
 
@@ -80,7 +82,7 @@ class Player(pygame.sprite.Sprite):
 		if self.selected_tool == 'axe':
 			for tree in self.tree_sprites.sprites():
 				if isinstance(tree, Tree) and tree.rect.collidepoint(self.target_pos):
-					tree.damage()
+					tree.damage(self)
 		
 		if self.selected_tool == 'water':
 			self.soil_layer.water(self.target_pos)
@@ -103,8 +105,7 @@ class Player(pygame.sprite.Sprite):
 						   'right_water':[],'left_water':[],'up_water':[],'down_water':[]}
 
 		for animation in self.animations.keys():
-			full_path = os.path.join(os.path.dirname(__file__), '..', 'graphics', 'character', animation)
-			self.animations[animation] = import_folder(full_path)
+			self.animations[animation] = assets.frames(f'graphics/character/{animation}')
 
 	def animate(self,dt):
 		self.frame_index += 4 * dt
@@ -115,63 +116,64 @@ class Player(pygame.sprite.Sprite):
 
 	def input(self):
 		keys = pygame.key.get_pressed()
+		keymap = self.keymap
 
 		if not self.timers['tool use'].active and not self.sleep:
 			# directions 
-			if keys[pygame.K_UP]:
+			if keys[keymap['up']]:
 				self.direction.y = -1
 				self.status = 'up'
-			elif keys[pygame.K_DOWN]:
+			elif keys[keymap['down']]:
 				self.direction.y = 1
 				self.status = 'down'
 			else:
 				self.direction.y = 0
 
-			if keys[pygame.K_RIGHT]:
+			if keys[keymap['right']]:
 				self.direction.x = 1
 				self.status = 'right'
-			elif keys[pygame.K_LEFT]:
+			elif keys[keymap['left']]:
 				self.direction.x = -1
 				self.status = 'left'
 			else:
 				self.direction.x = 0
 
 			# tool use
-			if keys[pygame.K_SPACE]:
+			if keys[keymap['tool']]:
 				self.timers['tool use'].activate()
 				self.direction = pygame.math.Vector2()
 				self.frame_index = 0
 
 			# change tool
-			if keys[pygame.K_q] and not self.timers['tool switch'].active:
+			if keys[keymap['switch tool']] and not self.timers['tool switch'].active:
 				self.timers['tool switch'].activate()
 				self.tool_index += 1
 				self.tool_index = self.tool_index if self.tool_index < len(self.tools) else 0
 				self.selected_tool = self.tools[self.tool_index]
 
 			# seed use
-			if keys[pygame.K_LCTRL]:
+			if keys[keymap['seed']]:
 				self.timers['seed use'].activate()
 				self.direction = pygame.math.Vector2()
 				self.frame_index = 0
 
 			# change seed 
-			if keys[pygame.K_e] and not self.timers['seed switch'].active:
+			if keys[keymap['switch seed']] and not self.timers['seed switch'].active:
 				self.timers['seed switch'].activate()
 				self.seed_index += 1
 				self.seed_index = self.seed_index if self.seed_index < len(self.seeds) else 0
 				self.selected_seed = self.seeds[self.seed_index]
 
-			if keys[pygame.K_RETURN]:
+			if keys[keymap['interact']]:
 				collided_interaction_sprite = pygame.sprite.spritecollide(self,self.interaction,False)
 				if collided_interaction_sprite:
 					if collided_interaction_sprite[0].name == 'Trader':
-						self.toggle_shop()
+						self.toggle_shop(self)
 					else:
 						self.status = 'left_idle'
 						self.sleep = True
 
-			if keys[pygame.K_x]:
+			if 'save' in keymap and keys[keymap['save']]:
 					if not hasattr(self, 'x_save_time'):
 						self.x_save_time = pygame.time.get_ticks()
 					elif pygame.time.get_ticks() - self.x_save_time > 300:  # 按住0.3秒保存
@@ -0,0 +1,104 @@
+import os
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from settings import *
+from assets import assets
+import tilemap
+
+# 农场用到过的资源清单：进农场、回标题时把 assets.requested 并进去，下次启动照着预加载。
+# 和地图缓存一样是生成的，第一次运行时还没有，只预加载地图
+PRELOAD_MANIFEST = os.path.join(assets.root, 'data', 'preload.cache')
+
+
+def read_manifest():
+    """清单里还存在的资源 [(kind, name)]。"""
+    try:
+        with open(PRELOAD_MANIFEST, encoding='utf-8') as f:
+            items = [tuple(item) for item in json.load(f)]
+    except (OSError, ValueError, TypeError):
+        return []
+    return [(kind, name) for kind, name in items if os.path.exists(assets.path(name))]
+
+
+def update_manifest():
+    items = read_manifest()
+    new = [key for key in assets.requested if key not in items]
+    if not new:
+        return
+    try:
+        with open(PRELOAD_MANIFEST, 'w', encoding='utf-8') as f:
+            json.dump(items + new, f)
+    except OSError as e:
+        print(f"Could not write preload manifest: {e}")
+
+
+class Preloader:
+    """标题画面显示时，在后台线程池里把进游戏要用的资源先解码好。
+
+    要预加载什么由上次运行记下的清单（PRELOAD_MANIFEST）决定，不用手写。
+    读文件、解 PNG/MP3、读地图缓存（过期时连 pytmx 解析一起）都在线程里做；convert 只能在主线程，
+    由 pump() 每帧在 PRELOAD_BUDGET_MS 内做一点，结果放进共享的 assets / tilemap 缓存。
+    开始游戏时 finish() 把剩下的收尾，之后 Level 拿到的全是缓存里的东西。
+    """
+
+    def __init__(self):
+        items = read_manifest()
+
+        self.executor = ThreadPoolExecutor(max_workers=PRELOAD_WORKERS)
+        self.map_future = self.executor.submit(tilemap.decode_map)
+        self.pending = [(kind, name, self.executor.submit(assets.decode, kind, name))
+                        for kind, name in items if (kind, name) not in assets.cache]
+        self.map_loaded = False
+
+    @property
+    def done(self):
+        return self.map_loaded and not self.pending
+
+    def finish_map(self):
+        try:
+            decoded = self.map_future.result()
+        except Exception as e:
+            print(f"Map preload failed: {e}")
+            decoded = None
+        if decoded:
+            tilemap.finish_map(*decoded)
+        else:
+            # 后台失败了：在主线程再试一次，报出真正的错
+            tilemap.load_map()
+        self.map_loaded = True
+
+    def finish_item(self, item):
+        kind, name, future = item
+        try:
+            decoded = future.result()
+        except Exception as e:
+            # 真正用到的时候 assets 会再试一次，并报出同样的错
+            print(f"Preload failed for {name}: {e}")
+            return
+        assets.store(kind, name, assets.finish(kind, decoded))
+
+    def pump(self, budget_ms=PRELOAD_BUDGET_MS):
+        """主线程每帧调用：把已经解码好的资源 convert 进缓存，超过预算就留到下一帧。"""
+        deadline = time.perf_counter() + budget_ms / 1000
+        if not self.map_loaded and self.map_future.done():
+            self.finish_map()
+
+        while self.pending and time.perf_counter() < deadline:
+            item = next((item for item in self.pending if item[2].done()), None)
+            if item is None:
+                break
+            self.pending.remove(item)
+            self.finish_item(item)
+
+        if self.done:
+            self.executor.shutdown(wait=False)
+
+    def finish(self):
+        """等后台把剩下的做完（进游戏时调用）。"""
+        if not self.map_loaded:
+            self.finish_map()
+        for item in self.pending:
+            self.finish_item(item)
+        self.pending = []
+        self.executor.shutdown(wait=False)
@@ -1,6 +1,7 @@
 import pygame
 import json
 import os
+from support import get_font, render_text
 
 class SaveSystem:
     def __init__(self):
@@ -8,7 +9,7 @@ class SaveSystem:
         os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
 
         self.screen = pygame.display.get_surface()
-        self.font = pygame.font.Font(None, 36)
+        self.font = get_font(None, 36)
         self.message = ""
         self.message_color = (255, 255, 255)
         self.message_timer = 0
@@ -20,7 +21,7 @@ class SaveSystem:
 
     def draw_message(self):
         if self.message and pygame.time.get_ticks() - self.message_timer < 1500:
-            text_surf = self.font.render(self.message, True, self.message_color)
+            text_surf = render_text(self.font, self.message, self.message_color)
             text_rect = text_surf.get_rect(center=(self.screen.get_width() // 2, 50))
             pygame.draw.rect(self.screen, (0, 0, 0), text_rect.inflate(20, 10))
             self.screen.blit(text_surf, text_rect)
@@ -0,0 +1,43 @@
+from assets import assets
+
+
+class SceneManager:
+    """拥有标题、操作说明、农场这几个场景，负责切换和它们的资源生命周期。
+
+    场景是有 update() 的任意对象（每帧调用一次，由 Main 负责限帧和 display.update），可选：
+      enter()    切进来时调用：恢复 exit() 暂停的东西（音乐、计时）
+      exit(name) 切到场景 name 时调用：暂停自己的声音、后台工作，不释放
+      keep_warm  True（默认）：切走后对象保留，下次切回来直接用；
+                 False：切走就丢掉，下次重新创建，占的东西随之释放
+
+    场景第一次用到时才通过注册的工厂函数创建。
+    每次切换之后按 TEXTURE_BUDGET_MB 清一次资源缓存：刚离开的场景放掉的东西这时才能释放。
+    """
+
+    def __init__(self):
+        self.factories = {}
+        self.scenes = {}
+        self.name = None
+        self.current = None
+
+    def register(self, name, factory):
+        self.factories[name] = factory
+
+    def switch(self, name):
+        old = self.current
+        if old is not None:
+            if hasattr(old, 'exit'):
+                old.exit(name)
+            if not getattr(old, 'keep_warm', True):
+                del self.scenes[self.name]
+
+        scene = self.scenes.get(name)
+        if scene is None:
+            scene = self.scenes[name] = self.factories[name]()
+        self.name, self.current = name, scene
+        if hasattr(scene, 'enter'):
+            scene.enter()
+        assets.trim()
+
+    def update(self):
+        self.current.update()
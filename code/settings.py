@@ -1,8 +1,83 @@
+import pygame
 from pygame.math import Vector2
 # screen
 SCREEN_WIDTH = 1280
 SCREEN_HEIGHT = 720
 TILE_SIZE = 64
+FPS = 60
+
+# display: extra pygame.display.set_mode flags (e.g. pygame.SCALED | pygame.FULLSCREEN)
+# and vsync (needs SCALED, which is added automatically)
+DISPLAY_FLAGS = 0
+VSYNC = False
+# the world is rendered at SCREEN_WIDTH / RENDER_SCALE x SCREEN_HEIGHT / RENDER_SCALE
+# and scaled up by this integer factor once per frame; UI always stays at full resolution
+RENDER_SCALE = 1
+
+# title-screen preloading: decoder threads, and main-thread time per frame for converting the results
+PRELOAD_WORKERS = 4
+PRELOAD_BUDGET_MS = 4
+# decoded images and sounds: above this many MB, cached assets nothing is using any more are
+# released (least recently used first) and reloaded when needed; 0 = no limit
+TEXTURE_BUDGET_MB = 128
+# print how long startup took to the first title frame (imports, display init, fonts, assets)
+STARTUP_REPORT = False
+# development: watch graphics/, audio/ and the map for changes and reload them while the farm is running
+HOT_RELOAD = False
+HOT_RELOAD_INTERVAL = 500  # ms between checks
+
+# camera culling
+CAMERA_CELL_SIZE = TILE_SIZE * 4
+CAMERA_MARGIN = TILE_SIZE * 2
+
+# static tile layers are baked into chunks of this many tiles per side
+BAKE_CHUNK_TILES = 8
+
+# day -> night sky colors are precomputed into this many steps
+SKY_GRADIENT_STEPS = 256
+
+# night lighting: light map resolution divisor, the player's torch and the default
+# radius/color for lights placed on the optional 'Lights' object layer of the map
+LIGHT_MAP_SCALE = 8
+PLAYER_LIGHT_RADIUS = 160
+PLAYER_LIGHT_COLOR = (150, 120, 80)
+LIGHT_RADIUS = 128
+LIGHT_COLOR = (220, 160, 90)
+
+# rain: particles per pool (floor splashes / falling drops) and how full the pools are kept
+RAIN_POOL_SIZE = 128
+RAIN_INTENSITY = 0.2
+
+# pet speech bubbles kept ready to draw
+BUBBLE_CACHE_SIZE = 16
+
+# local co-op: a second player with its own half of the screen
+SPLIT_SCREEN = False
+PLAYER_KEYS = [
+	{'up': pygame.K_UP, 'down': pygame.K_DOWN, 'left': pygame.K_LEFT, 'right': pygame.K_RIGHT,
+	 'tool': pygame.K_SPACE, 'switch tool': pygame.K_q, 'seed': pygame.K_LCTRL, 'switch seed': pygame.K_e,
+	 'interact': pygame.K_RETURN, 'save': pygame.K_x},
+	{'up': pygame.K_i, 'down': pygame.K_k, 'left': pygame.K_j, 'right': pygame.K_l,
+	 'tool': pygame.K_u, 'switch tool': pygame.K_o, 'seed': pygame.K_h, 'switch seed': pygame.K_p,
+	 'interact': pygame.K_RSHIFT},
+]
+
+# minimap in the top-right corner: pixels per map tile, distance from the screen edge, colors
+MINIMAP_TILE_SIZE = 3
+MINIMAP_MARGIN = 10
+MINIMAP_BORDER = 2
+MINIMAP_COLORS = {
+	'border': (60, 40, 30),
+	'ground': (120, 170, 90),
+	'water': (95, 160, 200),
+	'house': (165, 120, 85),
+	'fence': (120, 85, 60),
+	'tree': (45, 105, 60),
+	'farmable': (140, 185, 100),
+	'tilled': (175, 125, 85),
+	'watered': (115, 80, 60),
+	'plant': (70, 150, 55),
+	'player': (255, 255, 255)}
 
 # overlay positions 
 OVERLAY_POSITIONS = {
@@ -55,6 +130,12 @@ PURCHASE_PRICES = {
 FONT_PATH = 'font/LycheeSoda.ttf'
 FONT_SIZE = 24
 
+# rendered labels kept by support.render_text
+TEXT_CACHE_SIZE = 256
+
+# title screen clouds breathe through this many alpha steps
+CLOUD_ALPHA_LEVELS = 8
+
 UI_COLORS = {
     'text': (60, 60, 60),
     'bg': (30, 30, 40),
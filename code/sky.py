@@ -1,21 +1,25 @@
 # ...existing code...
-import pygame
-import os
 from settings import *
-from support import import_folder
-from sprites import Generic
-from random import randint, choice
+from assets import assets
+from random import randint
+from array import array
 
 class Sky:
-    def __init__(self):
-        self.display_surface = pygame.display.get_surface()
-        # use alpha surface so BLEND_RGBA_MULT behaves predictably
-        self.full_surf = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert_alpha()
+    def __init__(self, compositor):
+        # the tint is blended by the compositor together with the other full-screen passes
+        self.compositor = compositor
 
         # keep colors as lists for easy mutation
         self.start_color = [255, 255, 255]
         self.end_color = [38, 101, 189]
 
+        # day -> night colors, looked up by progress instead of computed every frame
+        steps = SKY_GRADIENT_STEPS
+        self.gradient = [
+            [int(self.start_color[i] + (self.end_color[i] - self.start_color[i]) * step / (steps - 1)) for i in range(3)]
+            for step in range(steps)
+        ]
+
         # current & target for smooth transitions
         self.current = list(self.start_color)
         self.target = list(self.start_color)  # start as daytime by default
@@ -27,10 +31,9 @@ class Sky:
  
     def set_time(self, progress):
         # progress: 0.0~1.0, 0=白天, 1=夜色
-        self.target = [
-            int(self.start_color[i] + (self.end_color[i] - self.start_color[i]) * progress)
-            for i in range(3)
-        ]
+        step = int(max(0.0, min(progress, 1.0)) * (SKY_GRADIENT_STEPS - 1))
+        self.target = self.gradient[step]
+
     def start_rain(self):
         self.target = list(self.end_color)
         self.is_raining = True
@@ -54,69 +57,103 @@ class Sky:
             dt = dt / 1000.0
 
         # move each channel toward its target at transition_speed per second
-        for i in range(3):
-            if self.current[i] < self.target[i]:
-                self.current[i] = min(self.current[i] + self.transition_speed * dt, self.target[i])
-            elif self.current[i] > self.target[i]:
-                self.current[i] = max(self.current[i] - self.transition_speed * dt, self.target[i])
-
-            # ensure integer in 0..255
-            self.current[i] = max(0, min(255, int(self.current[i])))
+        if self.current != self.target:
+            for i in range(3):
+                if self.current[i] < self.target[i]:
+                    self.current[i] = min(self.current[i] + self.transition_speed * dt, self.target[i])
+                elif self.current[i] > self.target[i]:
+                    self.current[i] = max(self.current[i] - self.transition_speed * dt, self.target[i])
+
+                # ensure integer in 0..255
+                self.current[i] = max(0, min(255, int(self.current[i])))
         #print("Sky color:", self.current) 
-        # fill and blit using multiply so underlying sprites keep tinting
-        self.full_surf.fill(tuple(self.current))
-        self.display_surface.blit(self.full_surf, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
-
-class Drop(Generic):
-    def __init__(self, surf, pos, moving, groups, z):
-        # general setup
-        super().__init__(pos, surf, groups, z)
-        self.lifetime = randint(400, 500)
-        self.start_time = pygame.time.get_ticks()
-
-        # moving
+        # multiply so underlying sprites keep tinting
+        self.compositor.multiply(self.current)
+
+class RainPool:
+    """固定容量的雨滴池。
+
+    位置、速度、剩余寿命都放在预先分配好的 array 里，
+    活着的粒子始终排在 [0, count) 里，死掉的用最后一个补位，不再产生任何精灵对象。
+    """
+
+    def __init__(self, frames, capacity, moving):
+        self.frames = frames
+        self.capacity = capacity
         self.moving = moving
-        if self.moving:
-            self.pos = pygame.math.Vector2(self.rect.topleft)
-            self.direction = pygame.math.Vector2(-2, 4)
-            self.speed = randint(200, 250)
+        self.count = 0
 
-    def update(self, dt):
-        # movement
-        if self.moving:
-            self.pos += self.direction * self.speed * dt
-            self.rect.topleft = (round(self.pos.x), round(self.pos.y))
+        self.x = array('f', bytes(4 * capacity))
+        self.y = array('f', bytes(4 * capacity))
+        self.speed = array('f', bytes(4 * capacity))
+        self.life = array('f', bytes(4 * capacity))
+        self.frame = array('B', bytes(capacity))
 
-        # timer
-        if pygame.time.get_ticks() - self.start_time >= self.lifetime:
-            self.kill()
+    def spawn(self, area):
+        if self.count >= self.capacity:
+            return
+        i = self.count
+        self.x[i] = randint(area.left, area.right)
+        self.y[i] = randint(area.top, area.bottom)
+        self.speed[i] = randint(200, 250)
+        self.life[i] = randint(400, 500) / 1000
+        self.frame[i] = randint(0, len(self.frames) - 1)
+        self.count += 1
+
+    def update(self, dt):
+        x, y, speed, life, frame = self.x, self.y, self.speed, self.life, self.frame
+        i = 0
+        while i < self.count:
+            life[i] -= dt
+            if life[i] <= 0:
+                # swap the last live particle into this slot
+                last = self.count - 1
+                x[i], y[i], speed[i], life[i], frame[i] = x[last], y[last], speed[last], life[last], frame[last]
+                self.count = last
+                continue
+            if self.moving:
+                x[i] += -2 * speed[i] * dt
+                y[i] += 4 * speed[i] * dt
+            i += 1
+
+    def draw(self, camera):
+        if self.count:
+            x, y, frame = self.x, self.y, self.frame
+            frames = [camera.image(surf) for surf in self.frames]
+            offset_x, offset_y, scale = camera.offset_x, camera.offset_y, camera.scale
+            camera.target.blits([
+                (frames[frame[i]], ((round(x[i]) - offset_x) // scale, (round(y[i]) - offset_y) // scale))
+                for i in range(self.count)
+            ], False)
 
 class Rain:
     def __init__(self, all_sprites):
         self.all_sprites = all_sprites
-        base = os.path.dirname(__file__)
-        self.rain_drops = import_folder(os.path.join(base, '..', 'graphics', 'rain', 'drops'))
-        self.rain_floor = import_folder(os.path.join(base, '..', 'graphics', 'rain', 'floor'))
-        self.floor_w, self.floor_h = pygame.image.load(os.path.join(base, '..', 'graphics', 'world', 'ground.png')).get_size()
-
-    def create_floor(self):
-        Drop(
-            surf = choice(self.rain_floor),
-            pos = (randint(0, self.floor_w), randint(0, self.floor_h)),
-            moving = False,
-            groups = self.all_sprites,
-            z = LAYERS['rain floor']
-        )
-
-    def create_drops(self):
-        Drop(
-            surf = choice(self.rain_drops),
-            pos = (randint(0, self.floor_w), randint(0, self.floor_h)),
-            moving = True,
-            groups = self.all_sprites,
-            z = LAYERS['rain drops']
-        )
-
-    def update(self):
-        self.create_floor()
-        self.create_drops()
\ No newline at end of file
+        self.rain_drops = assets.frames('graphics/rain/drops')
+        self.rain_floor = assets.frames('graphics/rain/floor')
+
+        # 0.0 ~ 1.0, at 1.0 the pools stay full
+        self.intensity = RAIN_INTENSITY
+        self.spawn_budget = 0.0
+        self.spawned = 0
+
+        self.floor = RainPool(self.rain_floor, RAIN_POOL_SIZE, moving=False)
+        self.drops = RainPool(self.rain_drops, RAIN_POOL_SIZE, moving=True)
+        all_sprites.add_painter(LAYERS['rain floor'], self.floor.draw)
+        all_sprites.add_painter(LAYERS['rain drops'], self.drops.draw)
+
+    def update(self, dt, raining):
+        self.floor.update(dt)
+        self.drops.update(dt)
+
+        if raining:
+            # particles live ~0.45s, so this rate keeps intensity * capacity of them alive
+            self.spawn_budget += self.intensity * RAIN_POOL_SIZE / 0.45 * dt
+            # only spawn inside (and just around) what the cameras can see, taking turns in split screen
+            views = list(self.all_sprites.views.values()) or [self.all_sprites.view]
+            while self.spawn_budget >= 1:
+                self.spawn_budget -= 1
+                area = views[self.spawned % len(views)]
+                self.spawned += 1
+                self.floor.spawn(area)
+                self.drops.spawn(area)
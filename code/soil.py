@@ -1,31 +1,26 @@
 import pygame
 from settings import *
-from pytmx.util_pygame import load_pygame
-from support import *
-import os
+from tilemap import load_map
+from assets import assets
 from random import choice
 
-class SoilTile(pygame.sprite.Sprite):
-    def __init__(self, pos, surf, groups):
-        super().__init__(groups)
-        self.image = surf
-        self.rect = self.image.get_rect(topleft=pos)
-        self.z = LAYERS['soil']
-
-class WaterTile(pygame.sprite.Sprite):
-    def __init__(self, pos, surf, groups):
-        super().__init__(groups)
-        self.image = surf
-        self.rect = self.image.get_rect(topleft=pos)
-        self.z = LAYERS['soil water']
+class FarmChunk(pygame.sprite.Sprite):
+    """一块 BAKE_CHUNK_TILES 见方的耕地（或浇水）画面，格子变化时只重画变了的瓦片。"""
+    def __init__(self, rect, z):
+        super().__init__()
+        self.image = pygame.Surface(rect.size, pygame.SRCALPHA)
+        self.rect = rect
+        self.z = z
+        # 画了东西的格子；为空时不放进绘制组
+        self.cells = set()
 
 class Plant(pygame.sprite.Sprite):
-    def __init__(self, plant_type, groups, soil, check_watered):
+    def __init__(self, plant_type, groups, soil_rect, check_watered):
         super().__init__(groups)
         
         # 保留原路径：graphics/fruit/corn
         self.plant_type = plant_type
-        self.frames = import_folder(os.path.join(os.path.dirname(__file__), '..', 'graphics', 'fruit', plant_type))
+        self.frames = assets.frames(f'graphics/fruit/{plant_type}')
         
         # 防止 frames 为空（路径错或没图）
         if not self.frames:
@@ -34,7 +29,7 @@ class Plant(pygame.sprite.Sprite):
             placeholder.fill((0, 255, 0))  # 绿色占位
             self.frames = [placeholder] * 3  # 至少3帧防崩溃
 
-        self.soil = soil
+        self.soil_rect = soil_rect
         self.check_watered = check_watered
 
         self.age = 0
@@ -45,7 +40,7 @@ class Plant(pygame.sprite.Sprite):
         # 安全取帧
         self.image = self.frames[self.age]
         self.y_offset = -16 if plant_type == 'corn' else -8
-        self.rect = self.image.get_rect(midbottom=soil.rect.midbottom + pygame.math.Vector2(0, self.y_offset))
+        self.rect = self.image.get_rect(midbottom=soil_rect.midbottom + pygame.math.Vector2(0, self.y_offset))
         self.z = LAYERS['ground plant']
 
     def grow(self):
@@ -63,32 +58,34 @@ class Plant(pygame.sprite.Sprite):
             # 安全更新图像
             frame_index = min(int(self.age), self.max_age)
             self.image = self.frames[frame_index]
-            self.rect = self.image.get_rect(midbottom=self.soil.rect.midbottom + pygame.math.Vector2(0, self.y_offset))
+            self.rect = self.image.get_rect(midbottom=self.soil_rect.midbottom + pygame.math.Vector2(0, self.y_offset))
 
 class SoilLayer:
     def __init__(self, all_sprites, collision_sprites):
         self.all_sprites = all_sprites
         self.collision_sprites = collision_sprites
-        self.soil_sprites = pygame.sprite.Group()
-        self.water_sprites = pygame.sprite.Group()
         self.plant_sprites = pygame.sprite.Group()
 
-        self.soil_surfs = import_folder_dict(os.path.join(os.path.dirname(__file__), '..', 'graphics', 'soil'))
-        self.water_surfs = import_folder(os.path.join(os.path.dirname(__file__), '..', 'graphics', 'soil_water'))
+        self.soil_surfs = assets.frames_dict('graphics/soil')
+        self.water_surfs = assets.frames('graphics/soil_water')
+        # (x, y) -> 这格浇水时随机到的图
+        self.water_tiles = {}
 
         self.create_soil_grid()
         self.create_hit_rects()
 
-        self.hoe_sound = pygame.mixer.Sound(os.path.join(os.path.dirname(__file__), '..', 'audio', 'hoe.wav'))
-        self.hoe_sound.set_volume(0.1)
-        self.plant_sound = pygame.mixer.Sound(os.path.join(os.path.dirname(__file__), '..', 'audio', 'plant.wav')) 
-        self.plant_sound.set_volume(0.2)
+        # grid 变化时通知谁：listener(tiles)，tiles 是变了的 (x, y) 列表
+        self.listeners = []
+        self.create_farm_chunks()
+        self.add_listener(self.patch_tiles)
+
+        self.hoe_sound = assets.sound('audio/hoe.wav', 0.1)
+        self.plant_sound = assets.sound('audio/plant.wav', 0.2)
 
     def create_soil_grid(self):
-        ground = pygame.image.load(os.path.join(os.path.dirname(__file__), '..', 'graphics', 'world', 'ground.png')).convert_alpha()
-        h_tiles, v_tiles = ground.get_width() // TILE_SIZE, ground.get_height() // TILE_SIZE
-        self.grid = [[[] for _ in range(h_tiles)] for _ in range(v_tiles)]
-        for x, y, _ in load_pygame(os.path.join(os.path.dirname(__file__), '..', 'data', 'map.tmx')).get_layer_by_name('Farmable').tiles():
+        tmx_data = load_map()
+        self.grid = [[[] for _ in range(tmx_data.width)] for _ in range(tmx_data.height)]
+        for x, y, _ in tmx_data.get_layer_by_name('Farmable').tiles():
             self.grid[y][x].append('F')
 
     def create_hit_rects(self):
@@ -101,79 +98,142 @@ class SoilLayer:
                     rect = pygame.Rect(x, y, TILE_SIZE, TILE_SIZE)
                     self.hit_rects.append(rect)
 
+    def create_farm_chunks(self):
+        """耕地和浇水不再一格一个精灵，而是每个有可耕地的区块各一张缓存表面。"""
+        chunk_size = BAKE_CHUNK_TILES * TILE_SIZE
+        bounds = pygame.Rect(0, 0, len(self.grid[0]) * TILE_SIZE, len(self.grid) * TILE_SIZE)
+        # (chunk_x, chunk_y) -> (soil chunk, water chunk)
+        self.farm_chunks = {}
+        for rect in self.hit_rects:
+            key = (rect.x // chunk_size, rect.y // chunk_size)
+            if key not in self.farm_chunks:
+                area = pygame.Rect(key[0] * chunk_size, key[1] * chunk_size, chunk_size, chunk_size).clip(bounds)
+                self.farm_chunks[key] = (FarmChunk(area, LAYERS['soil']), FarmChunk(area.copy(), LAYERS['soil water']))
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def notify(self, tiles):
+        tiles = list(tiles)
+        if tiles:
+            for listener in self.listeners:
+                listener(tiles)
+
+    def get_cell(self, pos):
+        x = int(pos[0]) // TILE_SIZE
+        y = int(pos[1]) // TILE_SIZE
+        if 0 <= y < len(self.grid) and 0 <= x < len(self.grid[0]):
+            return x, y, self.grid[y][x]
+        return x, y, None
+
+    def get_tile_type(self, index_col, index_row):
+        row = self.grid[index_row]
+        t = index_row > 0 and 'X' in self.grid[index_row - 1][index_col]
+        b = index_row < len(self.grid) - 1 and 'X' in self.grid[index_row + 1][index_col]
+        r = index_col < len(row) - 1 and 'X' in row[index_col + 1]
+        l = index_col > 0 and 'X' in row[index_col - 1]
+
+        tile_type = 'o'
+        if all((t, r, b, l)): tile_type = 'x'
+        elif l and not any((t, r, b)): tile_type = 'r'
+        elif r and not any((t, l, b)): tile_type = 'l'
+        elif r and l and not any((t, b)): tile_type = 'lr'
+        elif t and not any((r, l, b)): tile_type = 'b'
+        elif b and not any((r, l, t)): tile_type = 't'
+        elif b and t and not any((r, l)): tile_type = 'tb'
+        elif l and b and not any((t, r)): tile_type = 'tr'
+        elif r and b and not any((t, l)): tile_type = 'tl'
+        elif l and t and not any((b, r)): tile_type = 'br'
+        elif r and t and not any((b, l)): tile_type = 'bl'
+        elif all((t, b, r)) and not l: tile_type = 'tbr'
+        elif all((t, b, l)) and not r: tile_type = 'tbl'
+        elif all((l, r, t)) and not b: tile_type = 'lrb'
+        elif all((l, r, b)) and not t: tile_type = 'lrt'
+        return tile_type
+
+    def patch_tiles(self, tiles):
+        """按 grid 重画这些格子在缓存表面上的那一块。"""
+        chunk_size = BAKE_CHUNK_TILES * TILE_SIZE
+        changed = set()
+        for x, y in tiles:
+            if not (0 <= y < len(self.grid) and 0 <= x < len(self.grid[0])):
+                continue
+            chunks = self.farm_chunks.get((x * TILE_SIZE // chunk_size, y * TILE_SIZE // chunk_size))
+            if chunks is None:
+                continue
+            cell = self.grid[y][x]
+            soil_chunk, water_chunk = chunks
+            pos = (x * TILE_SIZE - soil_chunk.rect.x, y * TILE_SIZE - soil_chunk.rect.y)
+            area = pygame.Rect(pos, (TILE_SIZE, TILE_SIZE))
+
+            layers = [(soil_chunk, self.soil_surfs[self.get_tile_type(x, y)] if 'X' in cell else None)]
+            if 'W' in cell:
+                if (x, y) not in self.water_tiles:
+                    self.water_tiles[x, y] = choice(self.water_surfs)
+                layers.append((water_chunk, self.water_tiles[x, y]))
+            else:
+                self.water_tiles.pop((x, y), None)
+                layers.append((water_chunk, None))
+
+            for chunk, surf in layers:
+                if surf is None and (x, y) not in chunk.cells:
+                    continue
+                chunk.image.fill((0, 0, 0, 0), area)
+                if surf is None:
+                    chunk.cells.discard((x, y))
+                else:
+                    # 区域已清空，MAX 混合就是原样拷贝，半透明像素不会被混两次
+                    chunk.image.blit(surf, pos, special_flags=pygame.BLEND_RGBA_MAX)
+                    chunk.cells.add((x, y))
+                changed.add(chunk)
+
+        for chunk in changed:
+            if chunk.cells and not chunk.alive():
+                chunk.add(self.all_sprites)
+            elif not chunk.cells and chunk.alive():
+                chunk.kill()
+            self.all_sprites.refresh(chunk)
+
     # 新增：用于存档加载时重建耕地
     def create_soil_sprites(self):
         """重建所有耕地瓦片（存档加载专用）"""
-        self.soil_sprites.empty()
-        for index_row, row in enumerate(self.grid):
-            for index_col, cell in enumerate(row):
-                if 'X' in cell:
-                    # 边界安全检查
-                    t = index_row > 0 and 'X' in self.grid[index_row - 1][index_col]
-                    b = index_row < len(self.grid) - 1 and 'X' in self.grid[index_row + 1][index_col]
-                    r = index_col < len(row) - 1 and 'X' in row[index_col + 1]
-                    l = index_col > 0 and 'X' in row[index_col - 1]
-
-                    tile_type = 'o'
-                    if all((t, r, b, l)): tile_type = 'x'
-                    elif l and not any((t, r, b)): tile_type = 'r'
-                    elif r and not any((t, l, b)): tile_type = 'l'
-                    elif r and l and not any((t, b)): tile_type = 'lr'
-                    elif t and not any((r, l, b)): tile_type = 'b'
-                    elif b and not any((r, l, t)): tile_type = 't'
-                    elif b and t and not any((r, l)): tile_type = 'tb'
-                    elif l and b and not any((t, r)): tile_type = 'tr'
-                    elif r and b and not any((t, l)): tile_type = 'tl'
-                    elif l and t and not any((b, r)): tile_type = 'br'
-                    elif r and t and not any((b, l)): tile_type = 'bl'
-                    elif all((t, b, r)) and not l: tile_type = 'tbr'
-                    elif all((t, b, l)) and not r: tile_type = 'tbl'
-                    elif all((l, r, t)) and not b: tile_type = 'lrb'
-                    elif all((l, r, b)) and not t: tile_type = 'lrt'
-
-                    SoilTile(
-                        pos=(index_col * TILE_SIZE, index_row * TILE_SIZE),
-                        surf=self.soil_surfs[tile_type],
-                        groups=[self.all_sprites, self.soil_sprites]
-                    )
+        self.water_tiles.clear()
+        self.notify((rect.x // TILE_SIZE, rect.y // TILE_SIZE) for rect in self.hit_rects)
 
     def get_hit(self, point):
-        for rect in self.hit_rects:
-            if rect.collidepoint(point):
-                self.hoe_sound.play()
-                x = rect.x // TILE_SIZE
-                y = rect.y // TILE_SIZE
-                if 'F' in self.grid[y][x]:
-                    self.grid[y][x].append('X')
-                    self.create_soil_tiles()
-                    if self.raining:
-                        self.water_all()
+        x, y, cell = self.get_cell(point)
+        if cell and 'F' in cell:
+            self.hoe_sound.play()
+            if 'X' not in cell:
+                cell.append('X')
+                # 这一格和上下左右的边缘形状都可能变
+                self.notify([(x, y), (x, y - 1), (x, y + 1), (x - 1, y), (x + 1, y)])
+            if self.raining:
+                self.water_all()
 
     def water(self, target_pos):
-        for soil_sprite in self.soil_sprites.sprites():
-            if soil_sprite.rect.collidepoint(target_pos):
-                x = soil_sprite.rect.x // TILE_SIZE
-                y = soil_sprite.rect.y // TILE_SIZE
-                self.grid[y][x].append('W')
-                pos = soil_sprite.rect.topleft
-                surf = choice(self.water_surfs)
-                WaterTile(pos, surf, [self.all_sprites, self.water_sprites])
+        x, y, cell = self.get_cell(target_pos)
+        if cell and 'X' in cell and 'W' not in cell:
+            cell.append('W')
+            self.notify([(x, y)])
 
     def water_all(self):
+        tiles = []
         for index_row, row in enumerate(self.grid):
             for index_col, cell in enumerate(row):
                 if 'X' in cell and 'W' not in cell:
                     cell.append('W')
-                    x = index_col * TILE_SIZE
-                    y = index_row * TILE_SIZE
-                    WaterTile((x, y), choice(self.water_surfs), [self.all_sprites, self.water_sprites])
+                    tiles.append((index_col, index_row))
+        self.notify(tiles)
+
     def remove_water(self):
-        for sprite in self.water_sprites.sprites():
-            sprite.kill()
-        for row in self.grid:
-            for cell in row:
+        tiles = []
+        for index_row, row in enumerate(self.grid):
+            for index_col, cell in enumerate(row):
                 if 'W' in cell:
                     cell.remove('W')
+                    tiles.append((index_col, index_row))
+        self.notify(tiles)
 
     def check_watered(self, pos):
         x = pos[0] // TILE_SIZE
@@ -183,48 +243,23 @@ class SoilLayer:
         return False
 
     def plant_seed(self, target_pos, seed):
-        for soil_sprite in self.soil_sprites.sprites():
-            if soil_sprite.rect.collidepoint(target_pos):
-                self.plant_sound.play()
-                x = soil_sprite.rect.x // TILE_SIZE
-                y = soil_sprite.rect.y // TILE_SIZE
-                if 'P' not in self.grid[y][x]:
-                    self.grid[y][x].append('P')
-                    Plant(seed, [self.all_sprites, self.plant_sprites, self.collision_sprites], soil_sprite, self.check_watered)
+        x, y, cell = self.get_cell(target_pos)
+        if cell and 'X' in cell:
+            self.plant_sound.play()
+            if 'P' not in cell:
+                cell.append('P')
+                soil_rect = pygame.Rect(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+                Plant(seed, [self.all_sprites, self.plant_sprites, self.collision_sprites], soil_rect, self.check_watered)
+                self.notify([(x, y)])
+
+    def harvest(self, plant):
+        x = plant.soil_rect.x // TILE_SIZE
+        y = plant.soil_rect.y // TILE_SIZE
+        if 'P' in self.grid[y][x]:
+            self.grid[y][x].remove('P')
+            self.notify([(x, y)])
 
     def update_plants(self):
         for plant in self.plant_sprites.sprites():
             plant.grow()
-
-    def create_soil_tiles(self):
-        self.soil_sprites.empty()
-        for index_row, row in enumerate(self.grid):
-            for index_col, cell in enumerate(row):
-                if 'X' in cell:
-                    t = index_row > 0 and 'X' in self.grid[index_row - 1][index_col]
-                    b = index_row < len(self.grid) - 1 and 'X' in self.grid[index_row + 1][index_col]
-                    r = index_col < len(row) - 1 and 'X' in row[index_col + 1]
-                    l = index_col > 0 and 'X' in row[index_col - 1]
-
-                    tile_type = 'o'
-                    if all((t, r, b, l)): tile_type = 'x'
-                    elif l and not any((t, r, b)): tile_type = 'r'
-                    elif r and not any((t, l, b)): tile_type = 'l'
-                    elif r and l and not any((t, b)): tile_type = 'lr'
-                    elif t and not any((r, l, b)): tile_type = 'b'
-                    elif b and not any((r, l, t)): tile_type = 't'
-                    elif b and t and not any((r, l)): tile_type = 'tb'
-                    elif l and b and not any((t, r)): tile_type = 'tr'
-                    elif r and b and not any((t, l)): tile_type = 'tl'
-                    elif l and t and not any((b, r)): tile_type = 'br'
-                    elif r and t and not any((b, l)): tile_type = 'bl'
-                    elif all((t, b, r)) and not l: tile_type = 'tbr'
-                    elif all((t, b, l)) and not r: tile_type = 'tbl'
-                    elif all((l, r, t)) and not b: tile_type = 'lrb'
-                    elif all((l, r, b)) and not t: tile_type = 'lrt'
-
-                    SoilTile(
-                        pos=(index_col * TILE_SIZE, index_row * TILE_SIZE),
-                        surf=self.soil_surfs[tile_type],
-                        groups=[self.all_sprites, self.soil_sprites]
-                    )
\ No newline at end of file
+            self.all_sprites.refresh(plant)
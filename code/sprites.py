@@ -2,7 +2,9 @@ import pygame
 from settings import *
 from random import randint, choice
 from timer import Timer
-import os
+from assets import assets
+import weakref
+from heapq import heappush, heappop
 
 class Generic(pygame.sprite.Sprite):
 	def __init__(self, pos, surf, groups, z = LAYERS['main']):
@@ -21,64 +23,87 @@ class Interaction(Generic):
 class Water(Generic):
 	def __init__(self, pos, frames, groups):
 
-		#animation setup
+		# animation frames, switched by the shared clock in bake.WaterLayer
 		self.frames = frames
-		self.frame_index = 0
 
 		# sprite setup
 		super().__init__(
 				pos = pos, 
-				surf = self.frames[self.frame_index], 
+				surf = self.frames[0], 
 				groups = groups, 
 				z = LAYERS['water']) 
 
-	def animate(self,dt):
-		self.frame_index += 5 * dt
-		if self.frame_index >= len(self.frames):
-			self.frame_index = 0
-		self.image = self.frames[int(self.frame_index)]
-
-	def update(self,dt):
-		self.animate(dt)
-
 class WildFlower(Generic):
 	def __init__(self, pos, surf, groups):
 		super().__init__(pos, surf, groups)
 		self.hitbox = self.rect.copy().inflate(-20,-self.rect.height * 0.9)
 
 class Particle(Generic):
-	def __init__(self, pos, surf, groups, z, duration = 200):
+	"""白色闪光。由 ParticleSystem 创建、回收和复用，自己不再计时。"""
+	def __init__(self, pos, surf, groups, z):
 		super().__init__(pos, surf, groups, z)
-		self.start_time = pygame.time.get_ticks()
-		self.duration = duration
 
-		# white surface 
-		mask_surf = pygame.mask.from_surface(self.image)
-		new_surf = mask_surf.to_surface()
-		new_surf.set_colorkey((0,0,0))
-		self.image = new_surf
+class ParticleSystem:
+	def __init__(self, all_sprites):
+		self.all_sprites = all_sprites
+
+		# source surface -> its white silhouette, built once per image
+		self.flash_surfs = weakref.WeakKeyDictionary()
+
+		# finished particles waiting to be reused
+		self.pool = []
+
+		# heap of (expire time, spawn count, particle), all in ms of game time
+		self.active = []
+		self.time = 0
+		self.spawned = 0
+
+	def flash_surf(self, surf):
+		flash = self.flash_surfs.get(surf)
+		if flash is None:
+			# white surface 
+			mask_surf = pygame.mask.from_surface(surf)
+			flash = mask_surf.to_surface()
+			flash.set_colorkey((0,0,0))
+			self.flash_surfs[surf] = flash
+		return flash
+
+	def spawn(self, pos, surf, z, duration = 200):
+		image = self.flash_surf(surf)
+		if self.pool:
+			particle = self.pool.pop()
+			particle.image = image
+			particle.rect = image.get_rect(topleft = pos)
+			particle.z = z
+			self.all_sprites.add(particle)
+		else:
+			particle = Particle(pos, image, self.all_sprites, z)
+
+		self.spawned += 1
+		heappush(self.active, (self.time + duration, self.spawned, particle))
 
 	def update(self,dt):
-		current_time = pygame.time.get_ticks()
-		if current_time - self.start_time > self.duration:
-			self.kill()
+		self.time += dt * 1000
+		while self.active and self.active[0][0] <= self.time:
+			particle = heappop(self.active)[2]
+			particle.kill()
+			self.pool.append(particle)
 
 class Tree(Generic):
-    def __init__(self, pos, surf, groups, name, player_add):
+    def __init__(self, pos, surf, groups, name, player_add, particles):
         super().__init__(pos, surf, groups)
 
         # tree attributes
         self.health = 5
         self.alive = True
         self.player_add = player_add
+        self.particles = particles
         
         # 树桩
-        stump_path = os.path.join(os.path.dirname(__file__), '..', 'graphics', 'stumps', f'{"small" if name == "Small" else "large"}.png')
-        self.stump_surf = pygame.image.load(stump_path).convert_alpha()
+        self.stump_surf = assets.image(f'graphics/stumps/{"small" if name == "Small" else "large"}.png')
 
         # 苹果
-        apple_path = os.path.join(os.path.dirname(__file__), '..', 'graphics', 'fruit', 'apple.png')
-        self.apple_surf = pygame.image.load(apple_path).convert_alpha()
+        self.apple_surf = assets.image('graphics/fruit/apple.png')
         self.apple_pos = APPLE_POS[name]
 
         # ============ 关键修改：彻底干掉循环导入 ============
@@ -92,8 +117,7 @@ class Tree(Generic):
         self.apple_sprites = pygame.sprite.Group()
 
         # 声音
-        self.axe_sound = pygame.mixer.Sound(os.path.join(os.path.dirname(__file__), '..', 'audio', 'axe.mp3'))
-        self.axe_sound.set_volume(0.4)
+        self.axe_sound = assets.sound('audio/axe.mp3', 0.4)
 
         # 创建苹果
         self.create_fruit()
@@ -114,33 +138,31 @@ class Tree(Generic):
                 )
                 self.apple_sprites.add(apple)     # 同时加入管理组
 
-    def damage(self):
-        # 扣血
+    def damage(self, player=None):
+        # 扣血，东西记到砍树的 player 身上
         self.health -= 1
         self.axe_sound.play()
 
         # 掉一个苹果
         if len(self.apple_sprites) > 0:
             random_apple = choice(self.apple_sprites.sprites())
-            Particle(
+            self.particles.spawn(
                 pos=random_apple.rect.topleft,
                 surf=random_apple.image,
-                groups=self.all_sprites,
                 z=LAYERS['fruit'],
                 duration=400
             )
             random_apple.kill()  # 自动从两个组移除
-            self.player_add('apple')
+            self.player_add('apple', player)
 
         # 树死掉
         if self.health <= 0 and self.alive:
             self.alive = False
 
             # 大粒子特效
-            Particle(
+            self.particles.spawn(
                 pos=self.rect.topleft,
                 surf=self.image,
-                groups=self.all_sprites,
                 z=LAYERS['fruit'],
                 duration=300
             )
@@ -149,6 +171,7 @@ class Tree(Generic):
             self.image = self.stump_surf
             self.rect = self.image.get_rect(midbottom=self.rect.midbottom)
             self.hitbox = self.rect.copy().inflate(-10, -self.rect.height * 0.6)
+            self.all_sprites.refresh(self)
 
             # 加木头（只加一次！）
-            self.player_add('wood')
\ No newline at end of file
+            self.player_add('wood', player)
\ No newline at end of file
@@ -3,6 +3,9 @@ import pygame
 import os
 import math
 from settings import *
+from support import get_font, render_text
+from startup import startup
+from assets import assets
 
 # 如果你想统一管理音乐路径，建议在 settings.py 里加这一行：
 # START_BGM_PATH = os.path.join('audio', 'bgm', 'title.ogg')   # ← 改成你的音乐路径
@@ -17,34 +20,85 @@ class StartMenu:
         try:
             bgm_path = os.path.join('audio','title.ogg')  # ← 改成你的音乐文件名
             if os.path.exists(bgm_path):
-                pygame.mixer.music.load(bgm_path)
+                with startup.measure('assets'):
+                    pygame.mixer.music.load(bgm_path)
                 pygame.mixer.music.set_volume(0.4)   # 音量 0.0~1.0，随你喜欢
                 pygame.mixer.music.play(-1)          # -1 = 循环播放
         except Exception as e:
             print(f"标题BGM加载失败（可以忽略）：{e}")
 
         # 字体
-        self.font_title = pygame.font.Font(os.path.join('font', 'LycheeSoda.ttf'), 90)
-        self.font_menu  = pygame.font.Font(os.path.join('font', 'LycheeSoda.ttf'), 50)
-        self.font_small = pygame.font.Font(os.path.join('font', 'LycheeSoda.ttf'), 30)
+        self.font_title = get_font(os.path.join('font', 'LycheeSoda.ttf'), 90)
+        self.font_menu  = get_font(os.path.join('font', 'LycheeSoda.ttf'), 50)
+        self.font_small = get_font(os.path.join('font', 'LycheeSoda.ttf'), 30)
+
+        # 标题要单独调透明度，所以自己留一份
+        self.title_surf = self.font_title.render("Farming Land", True, (200, 255, 200))
 
         self.options = ["New Game", "Load Game", "Controls", "Quit"]
         self.selected = 0
         self.alpha = 0
         self.fade_in = True
 
+        self.load_backgrounds()
+        self.active = False
+
+        # 静态文字只渲染一次：每个选项准备 未选中/选中 两种颜色
+        self.option_surfs = [
+            (render_text(self.font_menu, text, (220, 220, 220)), render_text(self.font_menu, text, (255, 255, 120)))
+            for text in self.options
+        ]
+        self.version_surf = render_text(self.font_small, "v1.0", (180, 180, 180))
+
+    def load_backgrounds(self):
         # ================== 四层背景加载 ==================
-        folder = os.path.join('graphics', 'title')
+        folder = 'graphics/title'
         self.bg_sky    = self.load_and_scale(f'{folder}/sky.png')
         self.bg_far    = self.load_and_scale(f'{folder}/far.png')
         self.bg_near   = self.load_and_scale(f'{folder}/near.png')
         self.bg_clouds = self.load_and_scale(f'{folder}/clouds.png')
+        # 云要 set_alpha，缓存里的图是共享的，所以拿一份自己的
+        if self.bg_clouds:
+            self.bg_clouds = self.bg_clouds.copy()
+            assets.track(self.bg_clouds, 'title')
+
+        # 天空和远景完全静止：预先合成一张图，每帧只贴一次
+        self.bg_static = self.compose_static(self.bg_sky, self.bg_far)
+
+        # 云的透明度只分几档，档位变了才 set_alpha，不再每帧 copy 整张图
+        self.cloud_alpha_level = None
+
+    # 标题场景一直保留，字体和文字常驻；进农场时暂停 BGM，
+    # 放掉全屏背景（内存紧时 assets 可以释放它们），回来时再从缓存取。
+    # 看操作说明时 BGM 接着放，背景也留着
+    def enter(self):
+        self.active = True
+        pygame.mixer.music.unpause()
+        if self.bg_static is None:
+            self.load_backgrounds()
+
+    def exit(self, name):
+        self.active = False
+        if name != 'game':
+            return
+        pygame.mixer.music.pause()
+        self.bg_sky = self.bg_far = self.bg_near = self.bg_clouds = self.bg_static = None
 
     def load_and_scale(self, path):
-        if not os.path.exists(path):
+        if not os.path.exists(assets.path(path)):
+            return None
+        return assets.image(path, (SCREEN_WIDTH, SCREEN_HEIGHT))
+
+    def compose_static(self, *layers):
+        layers = [layer for layer in layers if layer]
+        if not layers:
             return None
-        img = pygame.image.load(path).convert_alpha()
-        return pygame.transform.scale(img, (SCREEN_WIDTH, SCREEN_HEIGHT))
+        surf = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        surf.fill((0, 0, 0))
+        for layer in layers:
+            surf.blit(layer, (0, 0))
+        assets.track(surf, 'title')
+        return surf
 
     def handle_event(self, event):
         if event.type == pygame.KEYDOWN:
@@ -66,7 +120,7 @@ class StartMenu:
                 self.select()
 
     def get_option_rect(self, i):
-        surf = self.font_menu.render(self.options[i], True, (255, 255, 255))
+        surf = self.option_surfs[i][0]
         return surf.get_rect(center=(SCREEN_WIDTH//2, 320 + i * 80))
 
     def select(self):
@@ -88,6 +142,8 @@ class StartMenu:
                 pygame.quit()
                 exit()
             self.handle_event(event)
+        if not self.active:
+            return   # 这一帧已经切到别的场景了
 
         # 呼吸动画（已优化频率和幅度）
         time = pygame.time.get_ticks() * 0.001
@@ -100,11 +156,11 @@ class StartMenu:
         self.draw()
 
     def draw(self):
-        # 1. 天空 + 远景（完全静止）
-        if self.bg_sky:
-            self.screen.blit(self.bg_sky, (0, 0))
-        if self.bg_far:
-            self.screen.blit(self.bg_far, (0, 0))
+        # 1. 天空 + 远景（完全静止，已预先合成）
+        if self.bg_static:
+            self.screen.blit(self.bg_static, (0, 0))
+        else:
+            self.screen.fill((0, 0, 0))   # 防止残影
 
         # 2. 中景草地（轻微摇曳）
         if self.bg_near:
@@ -117,23 +173,27 @@ class StartMenu:
             fixed_y = -22                                  # ← 只改这一个数字！调云的高度
             cloud_x = self.sway * 38                       # 左右呼吸幅度
 
-            alpha_surf = self.bg_clouds.copy()
-            alpha_surf.set_alpha(180 + int(self.breathe * 50))
+            # 透明度 130~230，按 CLOUD_ALPHA_LEVELS 档取整
+            level = round((self.breathe + 1) / 2 * (CLOUD_ALPHA_LEVELS - 1))
+            if level != self.cloud_alpha_level:
+                self.cloud_alpha_level = level
+                self.bg_clouds.set_alpha(130 + level * 100 // (CLOUD_ALPHA_LEVELS - 1))
 
-            # 三张无缝循环（永不露边）
-            self.screen.blit(alpha_surf, (cloud_x, fixed_y))
-            self.screen.blit(alpha_surf, (cloud_x + SCREEN_WIDTH, fixed_y))
-            self.screen.blit(alpha_surf, (cloud_x - SCREEN_WIDTH, fixed_y))
+            # 无缝循环（永不露边）：只贴屏幕上看得到的那两张
+            self.screen.blit(self.bg_clouds, (cloud_x, fixed_y))
+            if cloud_x < 0:
+                self.screen.blit(self.bg_clouds, (cloud_x + SCREEN_WIDTH, fixed_y))
+            elif cloud_x > 0:
+                self.screen.blit(self.bg_clouds, (cloud_x - SCREEN_WIDTH, fixed_y))
 
         # 标题（淡入，不上下跳）
-        title = self.font_title.render("Farming Land", True, (200, 255, 200))
+        title = self.title_surf
         title.set_alpha(self.alpha)
         self.screen.blit(title, title.get_rect(center=(SCREEN_WIDTH//2, 140)))
 
         # 菜单（几乎不动，只轻微呼吸）
         for i, text in enumerate(self.options):
-            color = (255, 255, 120) if i == self.selected else (220, 220, 220)
-            surf = self.font_menu.render(text, True, color)
+            surf = self.option_surfs[i][i == self.selected]
             y_pos = 320 + i * 80 + self.breathe * 3        # 非常轻微的呼吸感
             rect = surf.get_rect(center=(SCREEN_WIDTH//2, y_pos))
             self.screen.blit(surf, rect)
@@ -146,7 +206,7 @@ class StartMenu:
                                (rect.right + 20, line_y), (rect.right + 60, line_y), 6)
 
         # 版本号
-        ver = self.font_small.render("v1.0", True, (180, 180, 180))
+        ver = self.version_surf
         self.screen.blit(ver, (SCREEN_WIDTH - ver.get_width() - 20, SCREEN_HEIGHT - 40))
 
 
@@ -155,8 +215,8 @@ class ControlsScreen:
     def __init__(self, screen, back_callback):
         self.screen = screen
         self.back = back_callback
-        self.font_big = pygame.font.Font(os.path.join('font', 'LycheeSoda.ttf'), 70)
-        self.font = pygame.font.Font(os.path.join('font', 'LycheeSoda.ttf'), 42)
+        self.font_big = get_font(os.path.join('font', 'LycheeSoda.ttf'), 70)
+        self.font = get_font(os.path.join('font', 'LycheeSoda.ttf'), 42)
 
     def handle_event(self, event):
         if event.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN):
@@ -172,7 +232,7 @@ class ControlsScreen:
 
     def draw(self):
         self.screen.fill((30, 35, 60))
-        title = self.font_big.render("Controls", True, (200, 255, 200))
+        title = render_text(self.font_big, "Controls", (200, 255, 200))
         self.screen.blit(title, title.get_rect(center=(SCREEN_WIDTH//2, 100)))
 
         lines = [
@@ -184,5 +244,5 @@ class ControlsScreen:
         ]
         for i, text in enumerate(lines):
             color = (255, 255, 180) if i < 9 else (180, 180, 180)
-            surf = self.font.render(text, True, color)
+            surf = render_text(self.font, text, color)
             self.screen.blit(surf, surf.get_rect(center=(SCREEN_WIDTH//2, 220 + i * 52)))
\ No newline at end of file
@@ -0,0 +1,74 @@
+import sys
+import time
+from contextlib import contextmanager
+
+# 很重、应该等到真正用到时才导入的模块：第一帧之前就载入了说明有人又把它改成了提前导入
+DEFERRED_MODULES = ['requests', 'pytmx']
+
+
+class StartupTimer:
+    """从进程启动到画出第一帧的时间，按阶段分开记。
+
+    main.py 最先导入这个模块，导入的那一刻算起点。前后相接的阶段（导入）用 lap() 记，
+    散在各处的（字体、资源）用 measure() 累加，剩下的算 other。
+    measure() 可以嵌套，里层的时间只算给里层（只在主线程用）。
+    finish() 之后不再记录，measure() 只剩一次判断。
+    """
+
+    def __init__(self):
+        self.start = self.last = time.perf_counter()
+        self.phases = {}
+        # 正在 measure 的各层里，已经算给更里层的时间
+        self.nested = []
+        self.total = None
+        self.finished = False
+        # 后台线程里有意导入的重模块（地图缓存过期时 preload 在线程里跑 pytmx）
+        self.background = set()
+
+    def add(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0) + seconds
+
+    def lap(self, phase):
+        """把上一次 lap（或起点）到现在的时间记到 phase 上。"""
+        now = time.perf_counter()
+        if not self.finished:
+            self.add(phase, now - self.last)
+        self.last = now
+
+    @contextmanager
+    def measure(self, phase):
+        if self.finished:
+            yield
+            return
+        start = time.perf_counter()
+        self.nested.append(0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.add(phase, elapsed - self.nested.pop())
+            if self.nested:
+                self.nested[-1] += elapsed
+
+    def finish(self):
+        if not self.finished:
+            self.total = time.perf_counter() - self.start
+            self.finished = True
+
+    def report(self):
+        total = self.total if self.total is not None else time.perf_counter() - self.start
+        lines = [f'Startup: {total * 1000:.1f} ms to first frame']
+        for phase, seconds in self.phases.items():
+            lines.append(f'  {phase:<14}{seconds * 1000:8.1f} ms')
+        lines.append(f"  {'other':<14}{(total - sum(self.phases.values())) * 1000:8.1f} ms")
+
+        loaded = [name for name in DEFERRED_MODULES if name in sys.modules and name not in self.background]
+        if loaded:
+            lines.append(f"  imported before first frame (should be deferred): {', '.join(loaded)}")
+        background = [name for name in DEFERRED_MODULES if name in sys.modules and name in self.background]
+        if background:
+            lines.append(f"  imported on a worker thread: {', '.join(background)}")
+        return '\n'.join(lines)
+
+
+startup = StartupTimer()
@@ -1,5 +1,9 @@
 from os import walk
+import os
 import pygame
+from collections import OrderedDict
+from settings import *
+from startup import startup
 
 def import_folder(path):
 	surface_list = []
@@ -21,4 +25,29 @@ def import_folder_dict(path):
 			image_surf = pygame.image.load(full_path).convert_alpha()
 			surface_dict[image.split('.')[0]] = image_surf
 
-	return surface_dict
\ No newline at end of file
+	return surface_dict
+
+# ---------- fonts & text ----------
+fonts = {}
+text_cache = OrderedDict()
+
+def get_font(path, size):
+	"""Shared pygame Font per (path, size); path None is pygame's default font."""
+	key = (os.path.normcase(os.path.abspath(path)) if path else None, size)
+	font = fonts.get(key)
+	if font is None:
+		with startup.measure('fonts'):
+			font = fonts[key] = pygame.font.Font(path, size)
+	return font
+
+def render_text(font, text, color, antialias = True):
+	"""font.render() through a bounded LRU cache. The returned surface is shared, don't draw on it."""
+	key = (font, text, color if isinstance(color, str) else tuple(color), antialias)
+	text_surf = text_cache.get(key)
+	if text_surf is None:
+		text_surf = text_cache[key] = font.render(text, antialias, color)
+		if len(text_cache) > TEXT_CACHE_SIZE:
+			text_cache.popitem(last = False)
+	else:
+		text_cache.move_to_end(key)
+	return text_surf
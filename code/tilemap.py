@@ -0,0 +1,268 @@
+import os
+import pickle
+import threading
+import pygame
+from array import array
+from assets import assets
+from startup import startup
+
+MAP_PATH = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'data', 'map.tmx'))
+# bump when the cache layout changes
+MAP_CACHE_VERSION = 1
+
+# 本次运行已经载入的地图：path -> MapData
+maps = {}
+
+
+class TileLayer:
+    def __init__(self, name, width, gids, images):
+        self.name = name
+        self.width = width
+        self.gids = gids
+        self.images = images
+
+    def tiles(self):
+        """和 pytmx 一样：依次给出 (x, y, image)，空格子跳过。"""
+        width, images = self.width, self.images
+        for index, gid in enumerate(self.gids):
+            if gid:
+                yield index % width, index // width, images[gid]
+
+
+class MapObject:
+    def __init__(self, record, images):
+        self.name = record['name']
+        self.type = record['type']
+        self.x = record['x']
+        self.y = record['y']
+        self.width = record['width']
+        self.height = record['height']
+        self.properties = record['properties']
+        self.gid = record['gid']
+        self.image = images[self.gid] if self.gid else None
+
+
+class MapData:
+    """地图的编译结果，只提供游戏用到的那部分 pytmx 接口。
+
+    tile 层是一维的 gid 数组，对象层是普通对象的列表；
+    每个 gid 的图片记成（图集文件, 区域, 翻转, 转换方式），从缓存载入时直接切出来，不解析 XML。
+    """
+
+    def __init__(self, compiled, root, sheets=None):
+        self.width = compiled['width']
+        self.height = compiled['height']
+        self.tilewidth = compiled['tilewidth']
+        self.tileheight = compiled['tileheight']
+        self.root = root
+        self.records = compiled['images']
+        self.images = load_tile_images(self.records, root, sheets)
+        # 地图用到的所有文件（tmx、tsx、图块集图片）的绝对路径，热重载用来判断改的是不是地图
+        self.files = {os.path.normpath(os.path.join(root, source))
+                      for source in list(compiled['sources']) + [record[0] for record in self.records.values()]}
+
+        self.layers = {}
+        self.layer_data = {}
+        for name, kind, data in compiled['layers']:
+            self.layer_data[name] = data
+            if kind == 'tiles':
+                self.layers[name] = TileLayer(name, self.width, data, self.images)
+            else:
+                self.layers[name] = [MapObject(record, self.images) for record in data]
+
+    def get_layer_by_name(self, name):
+        try:
+            return self.layers[name]
+        except KeyError:
+            raise ValueError(f'Layer "{name}" not found in map')
+
+    def layer_gids(self, name):
+        data = self.layer_data[name]
+        if isinstance(data, list):
+            return {record['gid'] for record in data if record['gid']}
+        return set(data) - {0}
+
+    def layer_signature(self, name):
+        """图层内容加上它用到的每个 gid 的图片来源，两次载入之间没变说明这一层不用重建。"""
+        return self.layer_data[name], {gid: self.records.get(gid) for gid in self.layer_gids(name)}
+
+    def layer_files(self, name):
+        return {os.path.normpath(os.path.join(self.root, self.records[gid][0])) for gid in self.layer_gids(name) if gid in self.records}
+
+
+def load_tile_images(records, root, sheets=None):
+    # sheets: 已经解码好的图集（后台预加载），source -> surface
+    sheets = dict(sheets or {})
+    images = {}
+    for gid, (source, rect, flips, colorkey, alpha) in records.items():
+        sheet = sheets.get(source)
+        if sheet is None:
+            sheet = sheets[source] = pygame.image.load(os.path.join(root, source))
+        tile = sheet.subsurface(rect) if rect else sheet.copy()
+
+        # 和 pytmx.util_pygame 的 handle_transformation / smart_convert 一样
+        flipped_horizontally, flipped_vertically, flipped_diagonally = flips
+        if flipped_diagonally:
+            tile = pygame.transform.flip(pygame.transform.rotate(tile, 270), True, False)
+        if flipped_horizontally or flipped_vertically:
+            tile = pygame.transform.flip(tile, flipped_horizontally, flipped_vertically)
+        if colorkey:
+            tile = tile.convert()
+            tile.set_colorkey(pygame.Color(f'#{colorkey}'), pygame.RLEACCEL)
+        elif alpha:
+            tile = tile.convert_alpha()
+        else:
+            tile = tile.convert()
+        assets.track(tile, 'map tiles')
+        images[gid] = tile
+    return images
+
+
+def source_mtimes(sources, root):
+    mtimes = {}
+    for source in sources:
+        try:
+            mtimes[source] = os.path.getmtime(os.path.join(root, source))
+        except OSError:
+            mtimes[source] = None
+    return mtimes
+
+
+def compile_map(path):
+    """用 pytmx 解析一次地图，记下每个 gid 的图片是从哪张图的哪块切出来的。
+
+    不 convert，可以在后台线程跑（preload 在标题画面时就这么做）。
+    """
+    if threading.current_thread() is not threading.main_thread():
+        startup.background.add('pytmx')
+    import xml.etree.ElementTree as ElementTree
+    from pytmx import TiledMap, TiledObjectGroup, TiledTileLayer
+    from pytmx.util_pygame import handle_transformation
+
+    root = os.path.dirname(path)
+    loaded = {}
+
+    def recording_loader(filename, colorkey, **kwargs):
+        # 和 pytmx.util_pygame.pygame_image_loader 一样切图，只是不 convert：
+        # smart_convert 的判断（有没有透明像素）记下来，载入时再照着转换
+        image = pygame.image.load(filename)
+        pixelalpha = kwargs.get('pixelalpha', True)
+        source = os.path.relpath(filename, root).replace(os.sep, '/')
+
+        def load_image(rect=None, flags=None):
+            tile = image.subsurface(rect) if rect else image.copy()
+            if flags:
+                tile = handle_transformation(tile, flags)
+            flips = (bool(flags.flipped_horizontally), bool(flags.flipped_vertically), bool(flags.flipped_diagonally)) if flags else (False, False, False)
+            width, height = tile.get_size()
+            alpha = (not colorkey and pixelalpha
+                     and pygame.mask.from_surface(tile, 254).count() != width * height)
+            loaded[id(tile)] = (source, tuple(rect) if rect else None, flips, colorkey, alpha)
+            return tile
+
+        return load_image
+
+    tmx_data = TiledMap(path, image_loader=recording_loader)
+
+    images = {}
+    for gid, image in enumerate(tmx_data.images):
+        if image is not None and id(image) in loaded:
+            images[gid] = loaded[id(image)]
+
+    layers = []
+    for layer in tmx_data.layers:
+        if isinstance(layer, TiledTileLayer):
+            gids = array('I', (gid for row in layer.data for gid in row))
+            layers.append((layer.name, 'tiles', gids))
+        elif isinstance(layer, TiledObjectGroup):
+            records = [{
+                'name': obj.name,
+                'type': obj.type,
+                'x': obj.x,
+                'y': obj.y,
+                'width': obj.width,
+                'height': obj.height,
+                'properties': dict(obj.properties),
+                'gid': obj.gid,
+            } for obj in layer]
+            layers.append((layer.name, 'objects', records))
+
+    # 外部图块集（.tsx）改了也要重新编译
+    tilesets = [node.get('source') for node in ElementTree.parse(path).getroot().iter('tileset') if node.get('source')]
+    sources = [os.path.basename(path)] + tilesets
+
+    return {
+        'version': MAP_CACHE_VERSION,
+        'sources': source_mtimes(sources, root),
+        'width': tmx_data.width,
+        'height': tmx_data.height,
+        'tilewidth': tmx_data.tilewidth,
+        'tileheight': tmx_data.tileheight,
+        'images': images,
+        'layers': layers,
+    }
+
+
+def read_cache(cache_path, root):
+    try:
+        with open(cache_path, 'rb') as file:
+            compiled = pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+    if not isinstance(compiled, dict) or compiled.get('version') != MAP_CACHE_VERSION:
+        return None
+    if source_mtimes(compiled['sources'], root) != compiled['sources']:
+        return None
+    return compiled
+
+
+def write_cache(cache_path, compiled):
+    try:
+        with open(cache_path, 'wb') as file:
+            pickle.dump(compiled, file, pickle.HIGHEST_PROTOCOL)
+    except OSError as e:
+        print(f"Could not write map cache: {e}")
+
+
+def decode_map(path=MAP_PATH):
+    """可以在后台线程跑：读编译缓存（没有或过期时重新编译并写缓存）并解码图集，不 convert。"""
+    path = os.path.normpath(path)
+    root = os.path.dirname(path)
+    compiled = read_cache(path + '.cache', root)
+    if compiled is None:
+        compiled = compile_map(path)
+        write_cache(path + '.cache', compiled)
+    sources = {record[0] for record in compiled['images'].values()}
+    sheets = {source: pygame.image.load(os.path.join(root, source)) for source in sources}
+    return path, compiled, sheets
+
+
+def finish_map(path, compiled, sheets):
+    """主线程：用 decode_map 的结果建好 MapData，之后 load_map 直接返回它。"""
+    if path not in maps:
+        maps[path] = MapData(compiled, os.path.dirname(path), sheets)
+    return maps[path]
+
+
+def load_map(path=MAP_PATH):
+    """整个会话只载入一次地图；有新鲜的编译缓存（path + '.cache'）时完全跳过 XML 解析。"""
+    path = os.path.normpath(path)
+    map_data = maps.get(path)
+    if map_data is not None:
+        return map_data
+
+    root = os.path.dirname(path)
+    cache_path = path + '.cache'
+    compiled = read_cache(cache_path, root)
+    if compiled is None:
+        compiled = compile_map(path)
+        write_cache(cache_path, compiled)
+
+    map_data = maps[path] = MapData(compiled, root)
+    return map_data
+
+
+def reload_map(path=MAP_PATH):
+    """丢掉这次会话里载入的地图重新载入（地图或图块集改过之后，缓存过期会自动重新编译）。"""
+    maps.pop(os.path.normpath(path), None)
+    return load_map(path)
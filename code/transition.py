@@ -1,16 +1,12 @@
-import pygame
-from settings import *
-
 class Transition:
-	def __init__(self, reset, player):
+	def __init__(self, reset, players, compositor):
 		
 		# setup
-		self.display_surface = pygame.display.get_surface()
 		self.reset = reset
-		self.player = player
+		self.players = players
 
-		# overlay image
-		self.image = pygame.Surface((SCREEN_WIDTH,SCREEN_HEIGHT))
+		# fade is multiplied in by the compositor together with the sky tint
+		self.compositor = compositor
 		self.color = 255
 		self.speed = -2
 
@@ -22,8 +18,8 @@ class Transition:
 			self.reset()
 		if self.color > 255:
 			self.color = 255
-			self.player.sleep = False
+			for player in self.players:
+				player.sleep = False
 			self.speed = -2
 
-		self.image.fill((self.color,self.color,self.color))
-		self.display_surface.blit(self.image, (0,0), special_flags = pygame.BLEND_RGBA_MULT)
\ No newline at end of file
+		self.compositor.fade((self.color,self.color,self.color))
\ No newline at end of file